@@ -0,0 +1,82 @@
+""" Benchmark of the screening engine (see query.evaluator.screening) over synthetic scientific resources
+
+Usage: python3 -m benchmarks.screening [query.yml] [--records N]
+"""
+
+import argparse
+import random
+import time
+
+from model.resource import ResourceData
+from query.evaluator.screening import ScreeningEngine
+from query.importer.yaml import query_from_yaml
+
+__WORDS__ = 5000
+
+
+def get_resources(count: int, terms: list[str], seed: int = 0) -> list[ResourceData]:
+    """ Generate scientific resources with random words. Each field of a resource has each term with a probability
+    of 1/10, or less for queries with more than 10 terms, so a field has one of them on average
+
+    Args:
+        count (int): Number of resources
+        terms (list[str]): Terms of the query, included in some of the resources
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        list[ResourceData]: Generated resources
+    """
+    generator = random.Random(seed)
+    probability = min(0.1, 1 / max(len(terms), 1))
+    words = ["w" + str(index) for index in range(__WORDS__)]
+
+    def get_text(length: int) -> str:
+        text = generator.choices(words, k=length)
+        for term in terms:
+            if generator.random() < probability:
+                text.insert(generator.randrange(len(text) + 1), term)
+        return " ".join(text)
+
+    return [
+        ResourceData("", "", get_text(10).title(), get_text(180) + ".", "; ".join(generator.choices(words, k=5)))
+        for _ in range(count)
+    ]
+
+
+def get_terms(engine: ScreeningEngine) -> list[str]:
+    """ Get the terms of a compiled query
+
+    Args:
+        engine (ScreeningEngine): Compiled query
+
+    Returns:
+        list[str]: Terms as written in the query
+    """
+    return sorted({term for _, term in engine.bits})
+
+
+def main() -> None:
+    """ Screen the generated resources twice, printing the records per minute of each pass
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("query", nargs="?", default="example/query.yml", help="Query to screen with")
+    parser.add_argument("--records", type=int, default=100000, help="Number of resources to screen")
+    args = parser.parse_args()
+
+    engine = ScreeningEngine(query_from_yaml(args.query))
+    resources = get_resources(args.records, get_terms(engine))
+
+    # the first pass also normalizes the fields, which the load does anyway to find duplicates
+    for name in ("normalizing", "normalized"):
+        start = time.perf_counter()
+        matched = sum(1 for resource in resources if engine.screen(resource)[0])
+        elapsed = time.perf_counter() - start
+        print(
+            name.ljust(12)
+            + str(len(resources)) + " records, " + str(matched) + " matched, "
+            + str(round(len(resources) / elapsed * 60 / 1e6, 2)) + "M records/min"
+        )
+
+
+if __name__ == "__main__":
+    main()
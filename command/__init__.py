@@ -1,3 +1,4 @@
 import command.loader
 import command.query_generator
-import command.gui
\ No newline at end of file
+import command.gui
+import command.dedup
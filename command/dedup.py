@@ -0,0 +1,74 @@
+from command.command_base import CommandBase
+from database.connector import Connector
+
+
+class Deduplicator(CommandBase):
+  """ Finds near-duplicated scientific resources in a local database
+  """
+
+  NAME = "dedup"
+
+  def __init__(self, args) -> None:
+      super().__init__(args)
+
+  @staticmethod
+  def add_parameters(subparsers):
+      """ Add needed arguments for the deduplicator command. It includes:
+        - a database
+        - similarity threshold
+        - merge the near duplicates found
+
+      Args:
+          subparsers: Subparsers where to add the arguments to
+      """
+      parser = subparsers.add_parser(Deduplicator.NAME, description='find near-duplicated scientific resources in a local database')
+
+      parser.add_argument(
+        "-d",
+        "--database",
+        required=True,
+        help="Database where to look for near duplicates",
+      )
+
+      parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=0.8,
+        help="Minimum similarity (0 to 1) of title and abstract to consider two resources the same",
+      )
+
+      parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="Merge each near duplicate into the entry with the lowest ID, moving its sources. The review state of the duplicate is kept if the other entry was not reviewed, and entries reviewed differently are not merged",
+      )
+
+  def execute(self):
+      """ Execute the deduplicator command
+      """
+      database = Connector.get_database(self.args.database)
+
+      pairs = database.find_near_duplicates(self.args.threshold)
+      for first, second, similarity in pairs:
+          print(str(first) + " <-> " + str(second) + " (" + "{:.2f}".format(similarity) + ")")
+
+      print("Near duplicates found: " + str(len(pairs)))
+
+      if not self.args.merge:
+          return
+
+      # each entry is merged into the lowest ID of its group of near duplicates
+      kept = {}
+      for first, second, _ in pairs:
+          kept.setdefault(second, kept.get(first, first))
+
+      merged = 0
+      for duplicate, id in kept.items():
+          if database.merge_entries(id, duplicate):
+              merged += 1
+          else:
+              print("Not merged " + str(duplicate) + " into " + str(id) + ": both were reviewed with different states")
+
+      database.save()
+      print("Entries merged: " + str(merged))
@@ -1,9 +1,24 @@
+import itertools
+import os
+import time
+from typing import Iterable, Iterator
+
 from command.command_base import CommandBase
+from database import dedup
 from database.connector import Connector
-from loader.file import ieee_csv
-from loader.file import bibtex
+from database.entry import Entry
+from database.metrics import LoadMetrics
+from database.overlap import OverlapAnalysis
+from loader.file import parallel
+from loader.file.bibtex import BibtexLoader
+from loader.file.file_loader import FileLoader, get_origin
+from loader.file.ieee_csv import IEEECsvLoader
+from loader.remote.cache import ResponseCache
 from loader.remote.parameters import Parameters
+from model.normalization import normalize_resource
 from query.importer.yaml import query_from_yaml
+from query.planner.optimizer import optimize
+from query.evaluator.screening import ScreeningEngine
 from loader.remote.scopus import Scopus
 from loader.remote.ieee import IEEE
 
@@ -22,9 +37,18 @@ class Loader(CommandBase):
         - a database
         - bibtex file
         - ieee csv file
+        - files in any supported format
         - remote connection configuration
         - enable remote connection to ieee
         - enable remote connection to scopus
+        - resume the remote searches
+        - bulk load mode and its batch size
+        - number of processes parsing the files
+        - force loading files loaded before
+        - file where to write the metrics of the load
+        - dry run, and overlap between the files and the database
+        - near-duplicate detection
+        - query file to screen the resources before loading them
 
       Args:
           subparsers: Subparsers where to add the arguments to
@@ -53,6 +77,74 @@ class Loader(CommandBase):
         help="IEEE Csv file to import from.",
       )
 
+      parser.add_argument(
+        "-i",
+        "--input",
+        nargs="+",
+        action="extend",
+        help="Files to import from, in any supported format: " + ", ".join(file_loader.NAME for file_loader in FileLoader.__subclasses__()) + ". The format is detected from the content of each file",
+      )
+
+      parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Load the files in bulk mode: batched writes, no disk syncing and indexes created at the end. Faster for large files, but the database can get corrupted if the load is interrupted",
+      )
+
+      parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10000,
+        help="Number of rows written at once in bulk mode",
+      )
+
+      parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes parsing bibtex files, which are split so their parts are parsed in parallel. Files in other formats are read one entry at a time in the main process. The entries are inserted in the same order as with a single process",
+      )
+
+      parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Load all the records of the files, even if they were loaded before. By default, files which did not change since they were loaded are skipped, and only new or changed records of the other files are loaded",
+      )
+
+      parser.add_argument(
+        "--metrics-out",
+        metavar="JSON_FILE",
+        help="Write the metrics of the load (time of each stage, deduplication lookups and hits, records per second and peak memory) to a JSON file. A summary is always printed",
+      )
+
+      parser.add_argument(
+        "--near-duplicates",
+        type=float,
+        nargs="?",
+        const=0.8,
+        metavar="THRESHOLD",
+        help="Also detect near duplicates, comparing the similarity (0 to 1, defaults to 0.8) of title and abstract",
+      )
+
+      parser.add_argument(
+        "--screen",
+        metavar="QUERY_FILE",
+        help="Only load the resources from files which match the query of this file",
+      )
+
+      parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Read the files without writing anything, printing how many records of each file would be new",
+      )
+
+      parser.add_argument(
+        "--overlap",
+        action="store_true",
+        help="Print how many records of each file are also in each other file and in the database. Implies --dry-run",
+      )
+
       parser.add_argument(
         "--remote-ieee",
         action="store_true",
@@ -70,20 +162,54 @@ class Loader(CommandBase):
         help="Configuration yaml file for remote loading. This functionality is deprecated and not maintained anymore",
       )
 
+      parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the remote searches from the last page loaded, skipping the ones already loaded",
+      )
+
   def execute(self):
       """ Execute the loader command
       """
+      if self.args.dry_run or self.args.overlap:
+          self.__dry_run()
+          return
+
       database = Connector.get_database(self.args.database)
 
-      if self.args.csv is not None:
-          for file in self.args.csv:
-              resources = ieee_csv.get_entries(file)
-              database.insert(resources)
+      if self.args.near_duplicates is not None:
+          database.use_near_duplicates(self.args.near_duplicates)
+
+      if self.args.bulk:
+          database.start_bulk(self.args.batch_size)
 
-      if self.args.bibtex is not None:
-          for file in self.args.bibtex:
-              resources = bibtex.get_entries(file)
-              database.insert(resources)
+      self.__load_screening()
+
+      metrics = database.get_metrics()
+
+      files = []
+      for file_loader, file in self.__get_files():
+          if not self.args.force and database.is_file_loaded(file):
+              print(file + " did not change since it was loaded, skipped")
+          else:
+              files.append((file_loader, file))
+
+      for file, entries in self.__parse(files, metrics):
+          self.__insert(database, entries, file)
+          # records dropped by the screening are not loaded yet, so the file is read again by the next load, which
+          # skips the records already loaded by their fingerprints
+          if self.screening is None:
+              database.set_file_loaded(file)
+
+      if self.args.bulk:
+          start = time.perf_counter()
+          database.end_bulk()
+          metrics.add_time("insert", time.perf_counter() - start)
+
+      if len(files) != 0:
+          print(metrics.get_summary())
+          if self.args.metrics_out is not None:
+              metrics.write_json(self.args.metrics_out)
 
       if self.args.config is not None:
           Parameters.initialize(self.args.config)
@@ -91,16 +217,198 @@ class Loader(CommandBase):
       if Parameters.GLOBAL_PARAMETERS.get("query_file") is None:
           return
 
-      query = query_from_yaml(Parameters.GLOBAL_PARAMETERS["query_file"])
+      query = optimize(query_from_yaml(Parameters.GLOBAL_PARAMETERS["query_file"]))
 
       if self.args.remote_ieee:
-          ieee = IEEE(query)
-          resources = ieee.request_all()
-          database.insert(resources)
+          self.__load_searches(database, IEEE(query).split())
 
       if self.args.remote_scopus:
-          scopus = Scopus(query)
-          resources = scopus.request_all()
-          database.insert(resources)
+          self.__load_searches(database, Scopus(query).split())
+
+  def __load_searches(self, database: Connector, searches: list[IEEE | Scopus]) -> None:
+      """ Load the resources of the searches a query was split into. Resources found by more than one search are
+      deduplicated when inserted
+
+      Args:
+          database (Connector): Database where to insert the resources
+          searches (list[IEEE | Scopus]): Searches in a remote source
+      """
+      if len(searches) > 1:
+          print(searches[0].NAME + " search split into " + str(len(searches)) + " searches within the limits of the source")
+
+      for search in searches:
+          self.__load_remote(database, search)
+
+  def __load_remote(self, database: Connector, source: IEEE | Scopus) -> None:
+      """ Load the resources of a search in a remote source. Each page is inserted as soon as it arrives, together
+      with the checkpoint to request the next one, so with the resume option an interrupted search continues from the
+      last inserted page
+
+      Args:
+          database (Connector): Database where to insert the resources
+          source (IEEE | Scopus): Remote source to search
+      """
+      checkpoint = None
+      if self.args.resume:
+          saved = database.get_checkpoint(source.NAME, source.query)
+          if saved is not None:
+              checkpoint, complete = saved
+              if complete:
+                  print(source.NAME + " search was already loaded, skipped")
+                  return
+              print(source.NAME + " search resumed")
+
+      for page in source.request_pages(checkpoint):
+          database.set_checkpoint(source.NAME, source.query, source.get_checkpoint())
+          database.insert(Loader.__normalize(page))
+
+      database.set_checkpoint(source.NAME, source.query, source.get_checkpoint(), True)
+      database.save()
+
+      cache = ResponseCache.get_cache()
+      if cache is not None:
+          hits, oldest = cache.pop_hits(source.NAME)
+          if hits != 0:
+              print(
+                  source.NAME + " search: " + str(hits) + " responses read from the cache, stored since "
+                  + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(oldest))
+              )
+
+  @staticmethod
+  def __normalize(resources: list[Entry]) -> list[Entry]:
+      """ Normalize the resources got from a remote source
+
+      Args:
+          resources (list[Entry]): Resources to normalize
+
+      Returns:
+          list[Entry]: The same resources, normalized
+      """
+      for entry in resources:
+          normalize_resource(entry.resource)
+      return resources
+
+  def __get_files(self) -> list[tuple[type[FileLoader], str]]:
+      """ Get the files to load and the loader of each one. Csv and bibtex files are loaded first, then the input
+      files, whose format is detected
+
+      Returns:
+          list[tuple[type[FileLoader], str]]: Loader and path of each file, in the order they are loaded
+      """
+      files = [(IEEECsvLoader, file) for file in self.args.csv or []]
+      files += [(BibtexLoader, file) for file in self.args.bibtex or []]
+      files += [(FileLoader.detect(file), file) for file in self.args.input or []]
+      return files
+
+  def __load_screening(self) -> None:
+      """ Load the screening query, if any
+      """
+      self.screening = None
+      if self.args.screen is not None:
+          self.screening = ScreeningEngine(query_from_yaml(self.args.screen))
+
+  def __parse(self, files: list[tuple[type[FileLoader], str]], metrics: LoadMetrics) -> Iterator[tuple[str, Iterator[Entry]]]:
+      """ Parse files, in parallel if more than one job is requested. Only bibtex files are parsed in parallel (see
+      loader.file.parallel), the rest are streamed in this process as with one job. The entries of a file must be
+      consumed before getting the next file
+
+      Args:
+          files (list[tuple[type[FileLoader], str]]): Loader and path of each file
+          metrics (LoadMetrics): Metrics where to add the parse time
+
+      Yields:
+          Iterator[tuple[str, Iterator[Entry]]]: Each file and its entries, in order
+      """
+      if self.args.jobs > 1:
+          file_tasks = [parallel.get_tasks([(file_loader, file)]) for file_loader, file in files]
+          parsed = parallel.get_entries(list(itertools.chain.from_iterable(file_tasks)), self.args.jobs)
+          # the tasks are parsed in the order of the files, so each split file takes its tasks from the pool at its turn
+          for (file_loader, file), tasks in zip(files, file_tasks):
+              if parallel.can_split(file_loader, file):
+                  file_parsed = itertools.islice(parsed, len(tasks))
+                  yield (file, metrics.timed("parse", (entry for _, entries in file_parsed for entry in entries)))
+              else:
+                  yield (file, metrics.timed("parse", file_loader.get_entries(file)))
+
+      else:
+          for file_loader, file in files:
+              yield (file, metrics.timed("parse", file_loader.get_entries(file)))
+
+  def __prepare(self, resources: Iterable[Entry], metrics: LoadMetrics, counts: dict[str, int]) -> Iterator[Entry]:
+      """ Normalize resources (see model.normalization) and keep only the ones matching the screening query if any
+
+      Args:
+          resources (Iterable[Entry]): Resources to prepare
+          metrics (LoadMetrics): Metrics where to add the time of each stage
+          counts (dict[str, int]): Counters of the resources "read" and "matched" by the screening query
+
+      Yields:
+          Iterator[Entry]: Prepared resources
+      """
+      for entry in resources:
+          counts["read"] += 1
+
+          start = time.perf_counter()
+          normalize_resource(entry.resource)
+          normalized = time.perf_counter()
+          metrics.add_time("normalization", normalized - start)
+
+          if self.screening is not None:
+              matched, _ = self.screening.screen(entry.resource)
+              metrics.add_time("screening", time.perf_counter() - normalized)
+              if not matched:
+                  continue
+
+          counts["matched"] += 1
+          yield entry
+
+  def __insert(self, database: Connector, resources: Iterable[Entry], file: str) -> None:
+      """ Insert resources of a file into the database, keeping only the ones matching the screening query if any and
+      not loaded from the file before. The resources are consumed as they come, so they are never all in memory at once
+
+      Args:
+          database (Connector): Database where to insert the resources
+          resources (Iterable[Entry]): Resources to insert
+          file (str): File the resources come from
+      """
+      metrics = database.get_metrics()
+      counts = {"read": 0, "matched": 0, "new": 0}
+
+      def count_new(entries: Iterable[Entry]) -> Iterator[Entry]:
+          for entry in entries:
+              counts["new"] += 1
+              yield entry
+
+      resources = self.__prepare(resources, metrics, counts)
+      database.insert(count_new(database.track_records(file, resources, not self.args.force)))
+      metrics.records += counts["read"]
+
+      if self.screening is not None:
+          print("Screened " + str(counts["read"]) + " -> " + str(counts["matched"]))
+
+      if counts["matched"] != counts["new"]:
+          print("Skipped " + str(counts["matched"] - counts["new"]) + " records loaded from " + file + " before")
+
+  def __dry_run(self) -> None:
+      """ Read the files as when loading them, without writing anything. For each file, it prints how many records
+      it has and how many would be new. With the overlap option, it also prints how many records of each file are
+      found in each other file and in the database
+      """
+      self.__load_screening()
+
+      analysis = OverlapAnalysis()
+      # a database which does not exist is not created
+      if os.path.exists(self.args.database):
+          analysis.add_database(Connector.read_dedup_keys(self.args.database))
+
+      metrics = LoadMetrics()
+      for file, entries in self.__parse(self.__get_files(), metrics):
+          counts = {"read": 0, "matched": 0}
+          source = get_origin(file)
+          for entry in self.__prepare(entries, metrics, counts):
+              analysis.add(source, dedup.get_keys(entry.resource))
 
+          if self.screening is not None:
+              print("Screened " + str(counts["read"]) + " -> " + str(counts["matched"]))
 
+      print(analysis.get_summary(self.args.overlap))
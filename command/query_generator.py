@@ -1,10 +1,15 @@
 from command.command_base import CommandBase
+from database.connector import Connector
 
 from query.importer.yaml import query_from_yaml
 from query.exporter.serializer import get_query_string
 from query.exporter.scopus import ScopusQuery
 from query.exporter.ieee import IEEEQuery
 from query.exporter.acm import ACMQuery
+from query.evaluator.impact import ImpactAnalysis
+from query.exporter.fts5 import FTS5Query, get_match_string
+from query.model.query import Field, Operator, SingleQuery
+from query.planner.optimizer import get_hash, optimize
 
 
 class QueryGenerator(CommandBase):
@@ -20,6 +25,8 @@ class QueryGenerator(CommandBase):
   def add_parameters(subparsers):
       """ Add needed arguments for the query generator command. It includes:
         - a query file
+        - run the query against a local database
+        - analyze the impact of each part of the query in a local database
 
       Args:
           subparsers: Subparsers where to add the arguments to
@@ -33,10 +40,37 @@ class QueryGenerator(CommandBase):
           default="./example/query.yml",
       )
 
+      parser.add_argument(
+          "--local",
+          action="store_true",
+          help="Run the query against the full-text index of a local database and print the IDs of the matching entries",
+      )
+
+      parser.add_argument(
+          "--impact",
+          action="store_true",
+          help="Print how many entries of a local database each term and sub-query matches, how many it alone adds "
+          + "to the results (marginal) or removes from them (filtered), and their rejected values",
+      )
+
+      parser.add_argument(
+          "-d",
+          "--database",
+          help="Local database to run the query against",
+      )
+
   def execute(self):
       """ Execute the query generator command
       """
-      query = query_from_yaml(self.args.query_file)
+      query = optimize(query_from_yaml(self.args.query_file))
+
+      if self.args.local:
+          self.__run_local(query)
+          return
+
+      if self.args.impact:
+          self.__run_impact(query)
+          return
 
       self.__print_title("SCOPUS")
       print(get_query_string(query, ScopusQuery))
@@ -47,6 +81,36 @@ class QueryGenerator(CommandBase):
       self.__print_title("ACM")
       print(get_query_string(query, ACMQuery))
 
+      # the same for any equivalent query file, e.g. to know if the results of a search can be reused
+      self.__print_title("HASH")
+      print(get_hash(query))
+
+  def __run_local(self, query) -> None:
+      if self.args.database is None:
+          raise Exception("A database (-d) is needed to run the query locally")
+
+      match = get_match_string(query)
+      entries = Connector.get_database(self.args.database).get_entry_ids([], match)
+
+      self.__print_title("LOCAL")
+      print(match)
+      print("Matching entries: " + str(len(entries)))
+      for id in entries:
+          print(id)
+
+  def __run_impact(self, query) -> None:
+      if self.args.database is None:
+          raise Exception("A database (-d) is needed to analyze the impact of the query")
+
+      database = Connector.get_database(self.args.database)
+
+      def get_postings(field: Field, term: str) -> set[int]:
+          match = FTS5Query.get_single_query_string(SingleQuery(Operator.OR, False, [field], [term]))
+          return set(database.get_entry_ids([], match))
+
+      self.__print_title("IMPACT")
+      print(ImpactAnalysis(get_postings, database.get_rejected_by_id()).get_summary(query))
+
   def __print_title(self, title: str, char: str = "=") -> None:
       border = char * (len(title) + 6)
       print(border)
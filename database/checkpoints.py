@@ -0,0 +1,72 @@
+""" Checkpoints of the searches in remote sources, used to resume a search from the last page loaded into a database
+
+The checkpoint of a search is the state its connector needs to request the next page (e.g. the offset of the next
+record or the link to the next page). It is written in the same transaction as the entries of the page, so the
+checkpoint in the database always matches the last page inserted.
+"""
+
+import json
+import sqlite3
+
+
+class Checkpoints:
+    """ Checkpoints of the searches stored in a Sqlite3 database, identified by the remote source and the query
+    """
+
+    __TABLE_NAME = "remote_checkpoints"
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        """ Constructor. The table must exist already (see create_tables)
+
+        Args:
+            connection (sqlite3.Connection): Connection to the database
+        """
+        self.connection = connection
+
+    @staticmethod
+    def create_tables(cursor: sqlite3.Cursor) -> None:
+        """ Create the table of the checkpoints if not present
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+        """
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS "
+            + Checkpoints.__TABLE_NAME
+            + " (provider TEXT, query TEXT, checkpoint TEXT, complete INTEGER, PRIMARY KEY (provider, query))"
+        )
+
+    def get(self, provider: str, query: str) -> tuple[dict, bool] | None:
+        """ Get the checkpoint of a search
+
+        Args:
+            provider (str): Name of the remote source
+            query (str): Query of the search, as sent to the remote source
+
+        Returns:
+            tuple[dict, bool] | None: Checkpoint and whether all the pages were loaded, None if the search was never
+            loaded
+        """
+        row = self.connection.execute(
+            "SELECT checkpoint, complete FROM " + Checkpoints.__TABLE_NAME + " WHERE provider = ? AND query = ?",
+            (provider, query),
+        ).fetchone()
+        if row is None:
+            return None
+
+        return (json.loads(row[0]), row[1] == 1)
+
+    def set(self, provider: str, query: str, checkpoint: dict, complete: bool = False) -> None:
+        """ Set the checkpoint of a search. It is written in the current transaction, so it is committed together with
+        the entries
+
+        Args:
+            provider (str): Name of the remote source
+            query (str): Query of the search, as sent to the remote source
+            checkpoint (dict): State needed to request the next page
+            complete (bool, optional): All the pages were loaded. Defaults to False.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO " + Checkpoints.__TABLE_NAME + " VALUES (?, ?, ?, ?)",
+            (provider, query, json.dumps(checkpoint), 1 if complete else 0),
+        )
@@ -13,4 +13,5 @@ class Columns:
     REJECTED = 6
     SAVE_FOR_LATER = 7
     NOTES = 8
-    UNKNOWN = 9
+    SOURCES = 9
+    UNKNOWN = 10
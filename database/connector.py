@@ -1,6 +1,8 @@
-from typing import Self
+from typing import Iterable, Iterator, Self
 
 from database.entry import Entry
+from database.entry_sequence import EntrySequence
+from database.metrics import LoadMetrics
 
 
 class Connector:
@@ -16,11 +18,123 @@ class Connector:
         """
         pass
 
-    def insert(self, entries: list[Entry]) -> None:
+    def insert(self, entries: Iterable[Entry], chunk_size: int = 10000) -> None:
         """ Insert entries to the database
 
         Args:
-            entries (list[Entry]): List of entries to inseret into the database
+            entries (Iterable[Entry]): Entries to inseret into the database, consumed as they come
+            chunk_size (int, optional): Number of entries inserted between commits. Defaults to 10000.
+        """
+        pass
+
+    def start_bulk(self, batch_size: int = 10000) -> None:
+        """ Start a bulk load. Inserts done until end_bulk is called are optimized for large amounts of entries
+
+        Args:
+            batch_size (int, optional): Number of rows written to the database at once. Defaults to 10000.
+        """
+        pass
+
+    def end_bulk(self) -> None:
+        """ Finish a bulk load, writing all pending entries into the database
+        """
+        pass
+
+    def use_near_duplicates(self, threshold: float = 0.8) -> None:
+        """ Enable the near-duplicate detection when inserting entries
+
+        Args:
+            threshold (float, optional): Minimum similarity to consider two entries the same. Defaults to 0.8.
+        """
+        pass
+
+    def find_near_duplicates(self, threshold: float = 0.8) -> list[tuple[int, int, float]]:
+        """ Find all pairs of near-duplicated entries in the database
+
+        Args:
+            threshold (float, optional): Minimum similarity to consider two entries near duplicates. Defaults to 0.8.
+
+        Returns:
+            list[tuple[int, int, float]]: ID of the first entry, ID of the second entry and their similarity
+        """
+        pass
+
+    def merge_entries(self, id: int, duplicate_id: int, save: bool = False) -> bool:
+        """ Merge an entry into another one, moving the sources of the duplicate and removing it. The review state
+        (rejected, save for later and notes) of the duplicate is kept if the other entry was not reviewed. Entries
+        reviewed with different states are not merged
+
+        Args:
+            id (int): ID of the entry to keep
+            duplicate_id (int): ID of the entry to remove
+            save (bool, optional): Save into the database now or no. Defaults to False.
+
+        Returns:
+            bool: True if the entries were merged, False if their review states conflict
+        """
+        pass
+
+    def is_file_loaded(self, path: str) -> bool:
+        """ Check if a file was loaded into the database and did not change since then
+
+        Args:
+            path (str): Path to the file
+
+        Returns:
+            bool: True if the file was loaded with the same content
+        """
+        pass
+
+    def track_records(self, path: str, entries: Iterable[Entry], skip_loaded: bool = True) -> Iterator[Entry]:
+        """ Keep track of the entries loaded from a file, so they are not processed again if the file is loaded again
+
+        Args:
+            path (str): Path to the file
+            entries (Iterable[Entry]): Entries of the file
+            skip_loaded (bool, optional): Skip the entries loaded from the file before. Defaults to True.
+
+        Yields:
+            Iterator[Entry]: Entries to load
+        """
+        pass
+
+    def set_file_loaded(self, path: str) -> None:
+        """ Record that a file was loaded with its current content
+
+        Args:
+            path (str): Path to the file
+        """
+        pass
+
+    def get_checkpoint(self, provider: str, query: str) -> tuple[dict, bool] | None:
+        """ Get the checkpoint of a search in a remote source
+
+        Args:
+            provider (str): Name of the remote source
+            query (str): Query of the search, as sent to the remote source
+
+        Returns:
+            tuple[dict, bool] | None: Checkpoint and whether all the pages were loaded, None if the search was never
+            loaded
+        """
+        pass
+
+    def set_checkpoint(self, provider: str, query: str, checkpoint: dict, complete: bool = False) -> None:
+        """ Set the checkpoint of a search in a remote source. It is committed together with the next inserted entries
+
+        Args:
+            provider (str): Name of the remote source
+            query (str): Query of the search, as sent to the remote source
+            checkpoint (dict): State needed to request the next page
+            complete (bool, optional): All the pages were loaded. Defaults to False.
+        """
+        pass
+
+    def get_metrics(self) -> LoadMetrics:
+        """ Get the metrics of the entries inserted since the connector was created
+
+        Returns:
+            LoadMetrics: Metrics of the load
         """
         pass
 
@@ -29,6 +143,63 @@ class Connector:
         """
         pass
 
+    def get_entry_ids(self, rejected: [int], search: str | None = None) -> list[int]:
+        """ Get the IDs of all entries with the given rejected values, ordered by ID
+
+        Args:
+            rejected ([int]): Rejected values of the entries. All entries are returned if empty
+            search (str | None, optional): Full-text query the entries must match. Defaults to None, no filtering.
+
+        Returns:
+            list[int]: IDs of the entries
+        """
+        pass
+
+    def get_rejected_by_id(self) -> dict[int, int]:
+        """ Get the rejected value of every entry
+
+        Returns:
+            dict[int, int]: Rejected value of each entry ID
+        """
+        pass
+
+    def get_entries_by_id(self, ids: list[int]) -> list[tuple[int, Entry]]:
+        """ Get the entries with the given IDs
+
+        Args:
+            ids (list[int]): IDs of the entries to get
+
+        Returns:
+            list[tuple[int, Entry]]: ID and entries found, in no particular order
+        """
+        pass
+
+    def get_entry_sequence(self, rejected: [int], prefetch: int = 50, search: str | None = None) -> EntrySequence:
+        """ Get a lazy sequence of all entries with the given rejected values. Entries are only fetched from the
+        database when accessed, so getting the sequence is fast and uses little memory regardless of the number of entries
+
+        Args:
+            rejected ([int]): Rejected values of the entries. All entries are returned if empty
+            prefetch (int, optional): Number of entries fetched ahead and behind an accessed entry. Defaults to 50.
+            search (str | None, optional): Full-text query the entries must match. Defaults to None, no filtering.
+
+        Returns:
+            EntrySequence: Sequence of ID and entries ordered by ID
+        """
+        return EntrySequence(self.get_entry_ids(rejected, search), self.get_entries_by_id, prefetch)
+
+    def search(self, text: str, limit: int = 100) -> list[tuple[int, float, str]]:
+        """ Search entries by their title, abstract and keywords using a full-text index
+
+        Args:
+            text (str): Full-text query
+            limit (int, optional): Maximum number of results. Defaults to 100.
+
+        Returns:
+            list[tuple[int, float, str]]: ID, rank (lower is better) and snippet of the matching text of each entry, best ranked first
+        """
+        pass
+
     def update_rejected(self, id: int, reason: int, save: bool = False) -> None:
         """ Update the rejected field of an entry
 
@@ -78,4 +249,17 @@ class Connector:
       """
       classes = Connector.__subclasses__()
       return classes[0](args)
-          
+
+    @staticmethod
+    def read_dedup_keys(database: str) -> Iterator[tuple[str | None, str | None, str | None]]:
+      """ Gets the deduplication keys of all the entries of an existing database (see database.dedup) without
+      modifying it, not even to upgrade its schema. For now, only sqlite3 is supported
+
+      Args:
+          database (str): Path to the database
+
+      Yields:
+          Iterator[tuple[str | None, str | None, str | None]]: DOI, title and abstract keys of each entry
+      """
+      classes = Connector.__subclasses__()
+      return classes[0].read_dedup_keys(database)
@@ -0,0 +1,131 @@
+""" Normalized keys used to detect duplicated scientific resources in the database
+"""
+
+import hashlib
+
+from model.normalization import canonical_doi
+from model.resource import ResourceData, ResourceFields
+
+# translating is much faster than a regular expression, but only for ascii texts
+__ASCII_NOT_ALPHANUMERIC__ = {
+    code: " " for code in range(128) if not chr(code).isalnum()
+}
+__TEXT_FIELDS__ = {
+    ResourceFields.TITLE: lambda resource: resource.title,
+    ResourceFields.ABSTRACT: lambda resource: resource.abstract,
+    ResourceFields.KEYWORDS: lambda resource: resource.keywords,
+}
+
+
+def doi_key(doi: str) -> str | None:
+    """ Get the canonical form of a DOI. Resolver prefixes (https://doi.org/, doi:) are removed and the DOI is lowercased
+
+    Args:
+        doi (str): DOI as found in the scientific resource
+
+    Returns:
+        str | None: Canonical DOI, None if the DOI is empty
+    """
+    key = canonical_doi(doi)
+    return key if key != "" else None
+
+
+def text_key(text: str) -> str | None:
+    """ Get the normalized form of a text. Case and any character which is not a letter or a digit are ignored
+
+    Args:
+        text (str): Text to normalize
+
+    Returns:
+        str | None: Normalized text, None if nothing is left after normalizing
+    """
+    if text is None:
+        return None
+
+    text = text.casefold()
+    if text.isascii():
+        text = text.translate(__ASCII_NOT_ALPHANUMERIC__)
+    else:
+        # texts have few different characters, so replacing each one is faster than checking every character
+        for char in set(text):
+            if char != " " and not char.isalnum():
+                text = text.replace(char, " ")
+
+    key = " ".join(text.split())
+    return key if key != "" else None
+
+
+def title_key(title: str) -> str | None:
+    """ Get the normalized form of a title
+
+    Args:
+        title (str): Title of the scientific resource
+
+    Returns:
+        str | None: Normalized title, None if the title is empty
+    """
+    return text_key(title)
+
+
+def abstract_key(abstract: str) -> str | None:
+    """ Get a hash of the normalized abstract. Abstracts are long, so only a hash is kept to compare them
+
+    Args:
+        abstract (str): Abstract of the scientific resource
+
+    Returns:
+        str | None: Hexadecimal hash of the normalized abstract, None if the abstract is empty
+    """
+    return __hash_key(text_key(abstract))
+
+
+def __hash_key(key: str | None) -> str | None:
+    """ Get the hash of a key
+
+    Args:
+        key (str | None): Key to hash
+
+    Returns:
+        str | None: Hexadecimal hash of the key, None if there is no key
+    """
+    if key is None:
+        return None
+
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def get_text_key(resource: ResourceData, field: ResourceFields) -> str | None:
+    """ Get the normalized form of a field of a scientific resource (see text_key). It is cached in the resource, so
+    it is only computed once for each resource
+
+    Args:
+        resource (ResourceData): Scientific resource
+        field (ResourceFields): Field to normalize, the title, abstract or keywords
+
+    Returns:
+        str | None: Normalized field, None if nothing is left after normalizing
+    """
+    cache_key = ("text_key", field)
+    if cache_key not in resource.cache:
+        resource.cache[cache_key] = text_key(__TEXT_FIELDS__[field](resource))
+
+    return resource.cache[cache_key]
+
+
+def get_keys(resource: ResourceData) -> tuple[str | None, str | None, str | None]:
+    """ Get all the keys used to detect duplicates of a scientific resource. They are cached in the resource
+
+    Args:
+        resource (ResourceData): Scientific resource
+
+    Returns:
+        tuple[str | None, str | None, str | None]: DOI, title and abstract keys
+    """
+    if "dedup_keys" not in resource.cache:
+        resource.cache["dedup_keys"] = (
+            doi_key(resource.doi),
+            get_text_key(resource, ResourceFields.TITLE),
+            __hash_key(get_text_key(resource, ResourceFields.ABSTRACT)),
+        )
+
+    return resource.cache["dedup_keys"]
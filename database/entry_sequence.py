@@ -0,0 +1,77 @@
+from array import array
+from typing import Callable
+
+from database.entry import Entry
+
+
+class EntrySequence:
+    """ Lazy sequence of entries of a database. Only the IDs of the entries are kept in memory, the entries are
+    fetched from the database when accessed, together with a window of the entries around them.
+    """
+
+    def __init__(
+        self,
+        ids: array,
+        fetch: Callable[[list[int]], list[tuple[int, Entry]]],
+        prefetch: int = 50,
+    ) -> None:
+        """ Constructor
+
+        Args:
+            ids (array): IDs of the entries in the sequence, in the order they are accessed
+            fetch (Callable[[list[int]], list[tuple[int, Entry]]]): Function to get the ID and entry of a list of IDs from the database
+            prefetch (int, optional): Number of entries fetched ahead and behind the accessed entry. Defaults to 50.
+        """
+        self.ids = ids
+        self.fetch = fetch
+        self.prefetch = prefetch
+        self.cache = {}
+
+    def __len__(self) -> int:
+        """ Get the number of entries in the sequence
+
+        Returns:
+            int: Number of entries
+        """
+        return len(self.ids)
+
+    def __getitem__(self, position: int) -> tuple[int, Entry]:
+        """ Get the entry at a position of the sequence. If it is not cached, the window of entries around it is
+        fetched and the entries out of the window are dropped from the cache
+
+        Args:
+            position (int): Position of the entry
+
+        Raises:
+            IndexError: If the position is out of the sequence
+
+        Returns:
+            tuple[int, Entry]: ID and entry at the position
+        """
+        if position < 0:
+            position += len(self.ids)
+
+        if position < 0 or position >= len(self.ids):
+            raise IndexError("Entry position out of range: " + str(position))
+
+        id = self.ids[position]
+        if id not in self.cache:
+            self.__load_window(position)
+
+        return self.cache[id]
+
+    def __load_window(self, position: int) -> None:
+        """ Load the window of entries around a position into the cache
+
+        Args:
+            position (int): Position at the center of the window
+        """
+        window = set(
+            self.ids[max(0, position - self.prefetch) : position + self.prefetch + 1]
+        )
+
+        self.cache = {id: entry for id, entry in self.cache.items() if id in window}
+
+        to_fetch = [id for id in window if id not in self.cache]
+        for id, entry in self.fetch(to_fetch):
+            self.cache[id] = (id, entry)
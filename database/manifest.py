@@ -0,0 +1,174 @@
+""" Manifest of the files loaded into a database, used to load only what changed when loading the same files again
+
+For each loaded file, its size, modification time and a hash of its content are kept, so an unchanged file is found
+by comparing the size and modification time, and a file which was only touched by comparing the hash. For each
+record loaded from a file, a fingerprint of its content is kept, so only the new or changed records of an updated
+export are processed.
+"""
+
+import hashlib
+import os
+import sqlite3
+from typing import Iterable, Iterator
+
+from database.entry import Entry
+
+__HASH_BLOCK_SIZE__ = 1024 * 1024
+__FIELD_SEPARATOR__ = "\x1f"
+
+
+def file_hash(path: str) -> str:
+    """ Get the hash of the content of a file
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        str: Hexadecimal hash of the file
+    """
+    file_hash = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        while block := file.read(__HASH_BLOCK_SIZE__):
+            file_hash.update(block)
+
+    return file_hash.hexdigest()
+
+
+def fingerprint(entry: Entry) -> bytes:
+    """ Get the fingerprint of the content of an entry, including its sources
+
+    Args:
+        entry (Entry): Entry
+
+    Returns:
+        bytes: Fingerprint of the entry
+    """
+    resource = entry.resource
+    values = [resource.doi, resource.isbn, resource.title, resource.abstract, resource.keywords]
+    for source in entry.sources:
+        values += [source.origin, source.link]
+
+    return hashlib.blake2b(
+        __FIELD_SEPARATOR__.join(value or "" for value in values).encode("utf-8"), digest_size=16
+    ).digest()
+
+
+class Manifest:
+    """ Manifest of the loaded files stored in a Sqlite3 database. It uses two tables: one with the state of each
+    loaded file and one with the fingerprints of the records loaded from each file
+    """
+
+    __FILES_TABLE_NAME = "manifest_files"
+    __FINGERPRINTS_TABLE_NAME = "manifest_fingerprints"
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        """ Constructor. The tables must exist already (see create_tables)
+
+        Args:
+            connection (sqlite3.Connection): Connection to the database
+        """
+        self.connection = connection
+        # hashes computed while checking the files, not to read a file twice
+        self.hashes = {}
+
+    @staticmethod
+    def create_tables(cursor: sqlite3.Cursor) -> None:
+        """ Create the tables of the manifest if not present
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+        """
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS "
+            + Manifest.__FILES_TABLE_NAME
+            + " (path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, hash TEXT)"
+        )
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS "
+            + Manifest.__FINGERPRINTS_TABLE_NAME
+            + " (path TEXT, fingerprint BLOB, PRIMARY KEY (path, fingerprint)) WITHOUT ROWID"
+        )
+
+    def is_loaded(self, path: str) -> bool:
+        """ Check if a file was loaded and did not change since then. The content is only hashed if the size or
+        modification time changed. If only the modification time changed, it is updated in the manifest
+
+        Args:
+            path (str): Path to the file
+
+        Returns:
+            bool: True if the file was loaded with the same content
+        """
+        path = os.path.abspath(path)
+        row = self.connection.execute(
+            "SELECT size, mtime, hash FROM " + Manifest.__FILES_TABLE_NAME + " WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            return False
+
+        stat = os.stat(path)
+        if (stat.st_size, stat.st_mtime_ns) == (row[0], row[1]):
+            return True
+
+        if stat.st_size != row[0]:
+            return False
+
+        self.hashes[path] = file_hash(path)
+        if self.hashes[path] != row[2]:
+            return False
+
+        self.connection.execute(
+            "UPDATE " + Manifest.__FILES_TABLE_NAME + " SET mtime = ? WHERE path = ?", (stat.st_mtime_ns, path)
+        )
+        self.connection.commit()
+        return True
+
+    def track_records(self, path: str, entries: Iterable[Entry], skip_loaded: bool = True) -> Iterator[Entry]:
+        """ Keep the fingerprint of the entries loaded from a file. The fingerprints are written in the current
+        transaction, so they are committed together with the entries
+
+        Args:
+            path (str): Path to the file
+            entries (Iterable[Entry]): Entries of the file
+            skip_loaded (bool, optional): Skip the entries loaded from the file before. Defaults to True.
+
+        Yields:
+            Iterator[Entry]: Entries not loaded from the file before, or all of them if skip_loaded is False
+        """
+        path = os.path.abspath(path)
+        loaded = set(
+            row[0]
+            for row in self.connection.execute(
+                "SELECT fingerprint FROM " + Manifest.__FINGERPRINTS_TABLE_NAME + " WHERE path = ?", (path,)
+            )
+        )
+
+        cursor = self.connection.cursor()
+        for entry in entries:
+            entry_fingerprint = fingerprint(entry)
+            if entry_fingerprint in loaded:
+                if skip_loaded:
+                    continue
+            else:
+                loaded.add(entry_fingerprint)
+                cursor.execute(
+                    "INSERT INTO " + Manifest.__FINGERPRINTS_TABLE_NAME + " VALUES (?, ?)", (path, entry_fingerprint)
+                )
+
+            yield entry
+
+    def set_loaded(self, path: str) -> None:
+        """ Record the current state of a file once it is loaded
+
+        Args:
+            path (str): Path to the file
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        file_content_hash = self.hashes.pop(path, None) or file_hash(path)
+
+        self.connection.execute(
+            "INSERT OR REPLACE INTO " + Manifest.__FILES_TABLE_NAME + " VALUES (?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, file_content_hash),
+        )
+        self.connection.commit()
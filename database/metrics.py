@@ -0,0 +1,160 @@
+""" Metrics of the load of scientific resources into a database, to find out where the load time goes
+"""
+
+import json
+import sys
+import time
+from typing import Iterable, Iterator
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, where the peak memory is not reported
+    resource = None
+
+from database.entry import Entry
+
+
+class LoadMetrics:
+    """ Time spent in each stage of a load and counters of the deduplication. Stages are:
+      - parse: reading and parsing the files (waiting for the parsing processes when parsing in parallel)
+      - screening: evaluating the screening query
+      - normalization: calculating the deduplication keys
+      - dedup: looking for existing entries, including near duplicates
+      - insert: writing the entries and their sources, including commits
+    Only the stages which ran (e.g. screening only with a screening query) are reported.
+    """
+
+    STAGES = ("parse", "screening", "normalization", "dedup", "insert")
+    KEYS = ("doi", "title", "abstract")
+
+    def __init__(self) -> None:
+        """ Constructor. The load starts when the metrics are created
+        """
+        self.start = time.perf_counter()
+        self.records = 0
+        self.new_entries = 0
+        # time of each stage which ran
+        self.times = {}
+        # entries looked up by each key, and entries found to exist by each key
+        self.lookups = dict.fromkeys(LoadMetrics.KEYS, 0)
+        self.hits = dict.fromkeys(LoadMetrics.KEYS + ("near_duplicate",), 0)
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        """ Add time spent in a stage
+
+        Args:
+            stage (str): Stage of the load
+            seconds (float): Time spent
+        """
+        self.times[stage] = self.times.get(stage, 0.0) + seconds
+
+    def timed(self, stage: str, entries: Iterable[Entry]) -> Iterator[Entry]:
+        """ Measure the time spent getting the entries of an iterable, e.g. parsing them
+
+        Args:
+            stage (str): Stage the time is added to
+            entries (Iterable[Entry]): Entries to measure
+
+        Yields:
+            Iterator[Entry]: The same entries
+        """
+        iterator = iter(entries)
+        while True:
+            start = time.perf_counter()
+            entry = next(iterator, None)
+            self.times[stage] = self.times.get(stage, 0.0) + time.perf_counter() - start
+            if entry is None:
+                return
+            yield entry
+
+    def add_lookup(
+        self, keys: tuple[str | None, str | None, str | None], matched: tuple[bool, bool, bool] | None
+    ) -> None:
+        """ Count a lookup of an entry by its deduplication keys
+
+        Args:
+            keys (tuple[str | None, str | None, str | None]): DOI, title and abstract keys of the entry
+            matched (tuple[bool, bool, bool] | None): Keys shared with the existing entry, None if it did not exist
+        """
+        for name, key in zip(LoadMetrics.KEYS, keys):
+            if key is not None:
+                self.lookups[name] += 1
+
+        if matched is not None:
+            for name, key_matched in zip(LoadMetrics.KEYS, matched):
+                if key_matched:
+                    self.hits[name] += 1
+
+    def add_near_duplicate(self) -> None:
+        """ Count an entry found to exist by the near-duplicate detection
+        """
+        self.hits["near_duplicate"] += 1
+
+    def get_peak_rss(self) -> int | None:
+        """ Get the peak resident memory of the process
+
+        Returns:
+            int | None: Peak resident memory in bytes, None if not available in the platform
+        """
+        if resource is None:
+            return None
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+    def to_dict(self) -> dict:
+        """ Get the metrics as a dictionary, as written to JSON
+
+        Returns:
+            dict: Metrics
+        """
+        elapsed = time.perf_counter() - self.start
+        return {
+            "records": self.records,
+            "new_entries": self.new_entries,
+            "elapsed": elapsed,
+            "records_per_second": self.records / elapsed if elapsed > 0 else 0,
+            "peak_rss": self.get_peak_rss(),
+            "stages": {stage: self.times[stage] for stage in LoadMetrics.STAGES if stage in self.times},
+            "dedup": {"lookups": dict(self.lookups), "hits": dict(self.hits)},
+        }
+
+    def get_summary(self) -> str:
+        """ Get a human readable summary of the metrics
+
+        Returns:
+            str: Summary of the metrics
+        """
+        metrics = self.to_dict()
+        elapsed = metrics["elapsed"]
+
+        lines = [
+            "Loaded " + str(self.records) + " records (" + str(self.new_entries) + " new) in "
+            + "{:.2f}".format(elapsed) + " s (" + "{:.0f}".format(metrics["records_per_second"]) + " records/s)"
+        ]
+        for stage, seconds in metrics["stages"].items():
+            lines.append(
+                "  " + stage.ljust(14) + "{:9.2f}".format(seconds) + " s"
+                + " {:5.1f}%".format(100 * seconds / elapsed if elapsed > 0 else 0)
+            )
+
+        lines.append(
+            "  dedup lookups: " + ", ".join(name + " " + str(count) for name, count in self.lookups.items())
+        )
+        lines.append("  dedup hits: " + ", ".join(name + " " + str(count) for name, count in self.hits.items()))
+
+        if metrics["peak_rss"] is not None:
+            lines.append("  peak memory: " + "{:.1f}".format(metrics["peak_rss"] / (1024 * 1024)) + " MiB")
+
+        return "\n".join(lines)
+
+    def write_json(self, path: str) -> None:
+        """ Write the metrics to a JSON file
+
+        Args:
+            path (str): Path to the file
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
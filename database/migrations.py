@@ -0,0 +1,61 @@
+""" Versioned migrations of the schema of a Sqlite3 database
+
+The version of the schema is stored in the user_version pragma of the database. Each migration step upgrades the
+schema from one version to the next one, so opening an up-to-date database only needs to read that pragma. Databases
+created before the schema was versioned have version 0, so all the steps must work on a database where the changes
+of a step are already (partially) present.
+"""
+
+import sqlite3
+from typing import Callable
+
+
+def get_version(connection: sqlite3.Connection) -> int:
+    """ Get the version of the schema of a database
+
+    Args:
+        connection (sqlite3.Connection): Connection to the database
+
+    Returns:
+        int: Version of the schema, 0 for new or not versioned databases
+    """
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(connection: sqlite3.Connection, steps: list[Callable[[sqlite3.Cursor], None]]) -> int:
+    """ Upgrade the schema of a database running the steps it is missing. Each step runs in its own transaction
+    together with the update of the version, so an interrupted migration continues from the failed step the next time
+
+    Args:
+        connection (sqlite3.Connection): Connection to the database
+        steps (list[Callable[[sqlite3.Cursor], None]]): Ordered migration steps. Step N upgrades the schema to version N + 1
+
+    Raises:
+        Exception: If the database has a newer schema than the known steps
+
+    Returns:
+        int: Version of the schema after the migration
+    """
+    version = get_version(connection)
+    if version > len(steps):
+        raise Exception(
+            "The database schema (version "
+            + str(version)
+            + ") is newer than the supported one (version "
+            + str(len(steps))
+            + ")"
+        )
+
+    for step in steps[version:]:
+        cursor = connection.cursor()
+        cursor.execute("BEGIN")
+        try:
+            step(cursor)
+            version += 1
+            cursor.execute("PRAGMA user_version = " + str(version))
+            connection.commit()
+        except:
+            connection.rollback()
+            raise
+
+    return version
@@ -0,0 +1,342 @@
+""" Detection of near-duplicated scientific resources using MinHash signatures and LSH (Locality Sensitive Hashing)
+
+Two resources are near duplicates when the Jaccard similarity of the word shingles of their title and abstract is
+high, which happens for the same resource exported by different sources with different punctuation, LaTeX escapes
+or truncated abstracts. The MinHash signature of each resource is split in bands and each band is hashed, so
+resources sharing a band hash are candidates to be near duplicates and can be found using an index lookup instead
+of comparing against every resource in the database.
+"""
+
+import hashlib
+import sqlite3
+from array import array
+
+from database import dedup
+from model.resource import ResourceData, ResourceFields
+
+__SHINGLE_SIZE__ = 3
+__HASH_BITS__ = 64
+
+
+def shingles(resource: ResourceData) -> set[str]:
+    """ Get the word shingles of the title and abstract of a scientific resource. Texts are normalized before
+    splitting them, reusing the keys cached in the resource (see database.dedup.get_text_key)
+
+    Args:
+        resource (ResourceData): Scientific resource
+
+    Returns:
+        set[str]: Set of shingles, empty if the resource has no title nor abstract
+    """
+    keys = [dedup.get_text_key(resource, field) for field in (ResourceFields.TITLE, ResourceFields.ABSTRACT)]
+    text = " ".join(key for key in keys if key is not None)
+    if text == "":
+        return set()
+
+    words = text.split(" ")
+    if len(words) <= __SHINGLE_SIZE__:
+        return {" ".join(words)}
+
+    return {
+        " ".join(words[index : index + __SHINGLE_SIZE__])
+        for index in range(len(words) - __SHINGLE_SIZE__ + 1)
+    }
+
+
+def signature(resource_shingles: set[str], size: int) -> array | None:
+    """ Get the MinHash signature of a set of shingles. One permutation hashing is used: each shingle is hashed once,
+    the hash selects a bin of the signature and each bin keeps its minimum value. Empty bins are filled with the next
+    non-empty bin (densification), so the probability of two signatures having the same value in a bin is the
+    Jaccard similarity of the sets.
+
+    Args:
+        resource_shingles (set[str]): Shingles of the resource
+        size (int): Number of values of the signature
+
+    Returns:
+        array | None: Signature as an array of unsigned 64-bit values, None if there are no shingles
+    """
+    if len(resource_shingles) == 0:
+        return None
+
+    bins = [None] * size
+    for shingle in resource_shingles:
+        hash = int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        bin = hash % size
+        value = hash // size
+        if bins[bin] is None or value < bins[bin]:
+            bins[bin] = value
+
+    if None in bins:
+        # values of a bin are smaller than this offset, so the densified values never collide with real ones
+        offset = (1 << __HASH_BITS__) // size
+        densified = []
+        for index in range(size):
+            distance = 0
+            while bins[(index + distance) % size] is None:
+                distance += 1
+            densified.append(bins[(index + distance) % size] + distance * offset)
+        bins = densified
+
+    return array("Q", bins)
+
+
+def similarity(first: array, second: array) -> float:
+    """ Estimate the Jaccard similarity of two resources from their signatures
+
+    Args:
+        first (array): Signature of the first resource
+        second (array): Signature of the second resource
+
+    Returns:
+        float: Estimated similarity between 0 and 1
+    """
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+class NearDuplicateIndex:
+    """ Index of MinHash signatures stored in a Sqlite3 database. It creates two tables: one with the signature of
+    each entry and one with the hash of each band of the signatures, indexed to look up candidates.
+    """
+
+    __SIGNATURES_TABLE_NAME = "minhash_signatures"
+    __BANDS_TABLE_NAME = "minhash_bands"
+
+    def __init__(
+        self, connection: sqlite3.Connection, threshold: float = 0.8, bands: int = 16, rows: int = 4
+    ) -> None:
+        """ Constructor. Creates the tables of the index if not present. The probability of two entries being
+        candidates is 1 - (1 - s^rows)^bands for a similarity s, which with the default values is higher than 0.99
+        for similarities over 0.8 and lower than 0.1 for similarities under 0.3.
+
+        Args:
+            connection (sqlite3.Connection): Connection to the database
+            threshold (float, optional): Minimum estimated similarity to consider two entries near duplicates. Defaults to 0.8.
+            bands (int, optional): Number of bands of the signature. Defaults to 16.
+            rows (int, optional): Number of values in each band. Defaults to 4.
+        """
+        self.connection = connection
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS "
+            + NearDuplicateIndex.__SIGNATURES_TABLE_NAME
+            + " (entry_id INTEGER PRIMARY KEY, signature BLOB)"
+        )
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS "
+            + NearDuplicateIndex.__BANDS_TABLE_NAME
+            + " (band INTEGER, hash INTEGER, entry_id INTEGER)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS "
+            + NearDuplicateIndex.__BANDS_TABLE_NAME
+            + "_hash ON "
+            + NearDuplicateIndex.__BANDS_TABLE_NAME
+            + " (band, hash)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS "
+            + NearDuplicateIndex.__BANDS_TABLE_NAME
+            + "_entry ON "
+            + NearDuplicateIndex.__BANDS_TABLE_NAME
+            + " (entry_id)"
+        )
+        self.connection.commit()
+
+    def get_signature(self, resource: ResourceData) -> array | None:
+        """ Get the signature of a scientific resource with the size used by the index
+
+        Args:
+            resource (ResourceData): Scientific resource
+
+        Returns:
+            array | None: Signature of the resource, None if it has no title nor abstract
+        """
+        return signature(shingles(resource), self.bands * self.rows)
+
+    def find(self, resource_signature: array | None) -> tuple[int, float] | None:
+        """ Find the most similar entry in the index
+
+        Args:
+            resource_signature (array | None): Signature of the resource to look for
+
+        Returns:
+            tuple[int, float] | None: ID and estimated similarity of the most similar entry over the threshold, None if there is none
+        """
+        if resource_signature is None:
+            return None
+
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+
+        candidates = set()
+        for band, hash in self.__band_hashes(resource_signature):
+            candidates.update(
+                row[0]
+                for row in cursor.execute(
+                    "SELECT entry_id FROM "
+                    + NearDuplicateIndex.__BANDS_TABLE_NAME
+                    + " WHERE band = ? AND hash = ?",
+                    (band, hash),
+                )
+            )
+
+        best = None
+        for id in sorted(candidates):
+            candidate_signature = self.__get_stored_signature(cursor, id)
+            if candidate_signature is None:
+                continue
+
+            value = similarity(resource_signature, candidate_signature)
+            if value >= self.threshold and (best is None or value > best[1]):
+                best = (id, value)
+
+        return best
+
+    def add(self, id: int, resource_signature: array | None) -> None:
+        """ Add the signature of an entry to the index. Changes are not committed
+
+        Args:
+            id (int): ID of the entry
+            resource_signature (array | None): Signature of the entry. Nothing is added if None
+        """
+        if resource_signature is None:
+            return
+
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "INSERT OR REPLACE INTO "
+            + NearDuplicateIndex.__SIGNATURES_TABLE_NAME
+            + " VALUES (?, ?)",
+            (id, resource_signature.tobytes()),
+        )
+        cursor.executemany(
+            "INSERT INTO " + NearDuplicateIndex.__BANDS_TABLE_NAME + " VALUES (?, ?, ?)",
+            ((band, hash, id) for band, hash in self.__band_hashes(resource_signature)),
+        )
+
+    def remove(self, id: int) -> None:
+        """ Remove an entry from the index. Changes are not committed
+
+        Args:
+            id (int): ID of the entry
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "DELETE FROM " + NearDuplicateIndex.__SIGNATURES_TABLE_NAME + " WHERE entry_id = ?",
+            (id,),
+        )
+        cursor.execute(
+            "DELETE FROM " + NearDuplicateIndex.__BANDS_TABLE_NAME + " WHERE entry_id = ?",
+            (id,),
+        )
+
+    def add_missing(self, rows: sqlite3.Cursor) -> int:
+        """ Add to the index the entries which are not present yet
+
+        Args:
+            rows (sqlite3.Cursor): Rows of (id, title, abstract) of all the entries that should be in the index
+
+        Returns:
+            int: Number of entries added to the index
+        """
+        indexed = set(
+            row[0]
+            for row in self.connection.execute(
+                "SELECT entry_id FROM " + NearDuplicateIndex.__SIGNATURES_TABLE_NAME
+            )
+        )
+
+        added = 0
+        for id, title, abstract in rows:
+            if id in indexed:
+                continue
+
+            self.add(id, self.get_signature(ResourceData("", "", title, abstract, "")))
+            added += 1
+
+        self.connection.commit()
+        return added
+
+    def find_pairs(self) -> list[tuple[int, int, float]]:
+        """ Find all pairs of near duplicates in the index
+
+        Returns:
+            list[tuple[int, int, float]]: ID of the first entry, ID of the second entry and their estimated similarity, ordered by IDs
+        """
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+
+        candidates = cursor.execute(
+            "SELECT DISTINCT first.entry_id, second.entry_id FROM "
+            + NearDuplicateIndex.__BANDS_TABLE_NAME
+            + " AS first JOIN "
+            + NearDuplicateIndex.__BANDS_TABLE_NAME
+            + " AS second ON first.band = second.band AND first.hash = second.hash AND first.entry_id < second.entry_id"
+        ).fetchall()
+
+        signatures = {}
+        pairs = []
+        for first, second in sorted(candidates):
+            for id in (first, second):
+                if id not in signatures:
+                    signatures[id] = self.__get_stored_signature(cursor, id)
+
+            value = similarity(signatures[first], signatures[second])
+            if value >= self.threshold:
+                pairs.append((first, second, value))
+
+        return pairs
+
+    def __band_hashes(self, resource_signature: array) -> list[tuple[int, int]]:
+        """ Get the hash of each band of a signature
+
+        Args:
+            resource_signature (array): Signature to split into bands
+
+        Returns:
+            list[tuple[int, int]]: Band number and signed 64-bit hash of the band
+        """
+        return [
+            (
+                band,
+                int.from_bytes(
+                    hashlib.blake2b(
+                        resource_signature[band * self.rows : (band + 1) * self.rows].tobytes(),
+                        digest_size=8,
+                    ).digest(),
+                    "little",
+                    signed=True,
+                ),
+            )
+            for band in range(self.bands)
+        ]
+
+    def __get_stored_signature(self, cursor: sqlite3.Cursor, id: int) -> array | None:
+        """ Get the signature of an entry from the database
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+            id (int): ID of the entry
+
+        Returns:
+            array | None: Signature of the entry, None if the entry is not in the index
+        """
+        row = cursor.execute(
+            "SELECT signature FROM "
+            + NearDuplicateIndex.__SIGNATURES_TABLE_NAME
+            + " WHERE entry_id = ?",
+            (id,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        stored = array("Q")
+        stored.frombytes(row[0])
+        return stored
@@ -0,0 +1,134 @@
+""" Analysis of the overlap between sources of scientific resources, and between them and a database, without writing
+anything. Two resources overlap when they share a deduplication key (see database.dedup), as when loading them
+"""
+
+from typing import Iterable
+
+
+class OverlapAnalysis:
+    """ Overlap between sources, computed in memory with hash sets. Only the hashes of the deduplication keys of each
+    record are kept, so several hundred thousand records fit in memory
+    """
+
+    DATABASE = "(database)"
+
+    def __init__(self) -> None:
+        """ Constructor
+        """
+        # hashed keys of each record of each source, and hash sets of the DOI, title and abstract keys of each source
+        self.records = {}
+        self.key_sets = {}
+        # keys of the database and of the records added so far, to know which records would be new
+        self.seen = (set(), set(), set())
+        self.new = {}
+
+    def add_database(self, keys: Iterable[tuple[str | None, str | None, str | None]]) -> None:
+        """ Add the keys of the entries of a database. Must be called before adding any source
+
+        Args:
+            keys (Iterable[tuple[str | None, str | None, str | None]]): DOI, title and abstract keys of each entry
+        """
+        key_sets = self.key_sets.setdefault(OverlapAnalysis.DATABASE, (set(), set(), set()))
+        for hashed in map(OverlapAnalysis.__hash, keys):
+            for key_set, seen, key in zip(key_sets, self.seen, hashed):
+                if key is not None:
+                    key_set.add(key)
+                    seen.add(key)
+
+    def add(self, source: str, keys: tuple[str | None, str | None, str | None]) -> None:
+        """ Add a record of a source
+
+        Args:
+            source (str): Name of the source
+            keys (tuple[str | None, str | None, str | None]): DOI, title and abstract keys of the record
+        """
+        if source not in self.records:
+            self.records[source] = []
+            self.key_sets[source] = (set(), set(), set())
+            self.new[source] = 0
+
+        hashed = OverlapAnalysis.__hash(keys)
+        self.records[source].append(hashed)
+
+        if not OverlapAnalysis.__found(hashed, self.seen):
+            self.new[source] += 1
+
+        for key_set, seen, key in zip(self.key_sets[source], self.seen, hashed):
+            if key is not None:
+                key_set.add(key)
+                seen.add(key)
+
+    def get_matrix(self) -> dict[str, dict[str, int]]:
+        """ Get the overlap matrix. For each source and each other source or the database, the number of records of
+        the source which share a key with a record of the other one
+
+        Returns:
+            dict[str, dict[str, int]]: Number of overlapping records for each source and other source
+        """
+        matrix = {}
+        for source, records in self.records.items():
+            matrix[source] = {}
+            for other, key_sets in self.key_sets.items():
+                if other != source:
+                    matrix[source][other] = sum(1 for hashed in records if OverlapAnalysis.__found(hashed, key_sets))
+
+        return matrix
+
+    def get_summary(self, overlap: bool = True) -> str:
+        """ Get a human readable table with the number of records of each source, how many of them would be new if the
+        sources were loaded in order and, optionally, the overlap matrix
+
+        Args:
+            overlap (bool, optional): Include the overlap with each other source and the database. Defaults to True.
+
+        Returns:
+            str: Table of the sources
+        """
+        matrix = self.get_matrix() if overlap else {}
+        columns = list(self.key_sets.keys()) if overlap else []
+        if OverlapAnalysis.DATABASE in columns:
+            # the database goes last
+            columns.remove(OverlapAnalysis.DATABASE)
+            columns.append(OverlapAnalysis.DATABASE)
+
+        header = ["source", "records", "new"] + columns
+        rows = [header]
+        for source, records in self.records.items():
+            row = [source, str(len(records)), str(self.new[source])]
+            for column in columns:
+                if column == source:
+                    row.append("-")
+                else:
+                    count = matrix[source][column]
+                    row.append(str(count) + " (" + "{:.0f}".format(100 * count / len(records)) + "%)")
+            rows.append(row)
+
+        widths = [max(len(row[index]) for row in rows) for index in range(len(header))]
+        return "\n".join(
+            "  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip() for row in rows
+        )
+
+    def __hash(keys: tuple[str | None, str | None, str | None]) -> tuple[int | None, int | None, int | None]:
+        """ Hash the keys of a record
+
+        Args:
+            keys (tuple[str | None, str | None, str | None]): DOI, title and abstract keys
+
+        Returns:
+            tuple[int | None, int | None, int | None]: Hash of each key, None for missing keys
+        """
+        return tuple(hash(key) if key is not None else None for key in keys)
+
+    def __found(
+        hashed: tuple[int | None, int | None, int | None], key_sets: tuple[set[int], set[int], set[int]]
+    ) -> bool:
+        """ Check if a record shares any key with a set of records
+
+        Args:
+            hashed (tuple[int | None, int | None, int | None]): Hashed keys of the record
+            key_sets (tuple[set[int], set[int], set[int]]): Hash sets of the DOI, title and abstract keys of the records
+
+        Returns:
+            bool: True if any key is found
+        """
+        return any(key is not None and key in key_set for key, key_set in zip(hashed, key_sets))
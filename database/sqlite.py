@@ -1,43 +1,370 @@
+import os
 import sqlite3
+import time
+import urllib.parse
+from array import array
+from typing import Iterable, Iterator
 
+from database import dedup, migrations
+from database.checkpoints import Checkpoints
 from database.columns import Columns
 from database.connector import Connector
 from database.entry import Entry, EntrySource, EntryState
+from database.manifest import Manifest
+from database.metrics import LoadMetrics
+from database.near_duplicates import NearDuplicateIndex
+from model.normalization import normalize_resource
 from model.resource import ResourceData
 
+class BulkLoad:
+    """ State of a bulk load into a Sqlite3 database
+    """
+
+    def __init__(self, batch_size: int, synchronous: int, journal_mode: str) -> None:
+        """ Constructor
+
+        Args:
+            batch_size (int): Number of rows written to the database at once
+            synchronous (int): Value of the synchronous pragma before the bulk load started
+            journal_mode (str): Value of the journal_mode pragma before the bulk load started
+        """
+        self.batch_size = batch_size
+        self.synchronous = synchronous
+        self.journal_mode = journal_mode
+        self.next_id = 1
+        self.ids_by_key = [{}, {}, {}]
+        self.main_rows = []
+        self.source_rows = []
+
+    def add_keys(self, id: int, keys: tuple[str | None, str | None, str | None]) -> None:
+        """ Store the deduplication keys of a row. If a key is already stored, the previous row is kept
+
+        Args:
+            id (int): ID of the row
+            keys (tuple[str | None, str | None, str | None]): Deduplication keys of the row
+        """
+        for ids, key in zip(self.ids_by_key, keys):
+            if key is not None:
+                ids.setdefault(key, id)
+
+    def get_existing_id(self, keys: tuple[str | None, str | None, str | None]) -> int | None:
+        """ Get the ID of the first row which shares one of the deduplication keys
+
+        Args:
+            keys (tuple[str | None, str | None, str | None]): Deduplication keys to look for
+
+        Returns:
+            int | None: ID of the existing row, None if no row shares any key
+        """
+        existing_ids = [ids[key] for ids, key in zip(self.ids_by_key, keys) if key in ids]
+        return min(existing_ids) if len(existing_ids) != 0 else None
+
+
 class Sqlite3(Connector):
     """ Conector to a Sqlite3 database. The connector creates a "main" table with all the information about an entry
-    except the sources. The sources are stored in their own table with the ID as link to the main table.
+    except the sources. The sources of all entries are stored in a "sources" table with the ID as link to the main table.
     """
 
     __MAIN_TABLE_NAME = "main"
+    __SOURCES_TABLE_NAME = "sources"
+    __SEARCH_TABLE_NAME = "main_fts"
+    # weights of the title, abstract and keywords columns when ranking search results
+    __SEARCH_WEIGHTS = "10.0, 1.0, 5.0"
+    # separators used to aggregate the sources of an entry into a single column
+    __SOURCE_SEPARATOR = "\x1e"
+    __ORIGIN_SEPARATOR = "\x1f"
+    __MAIN_COLUMNS = "main.id, main.doi, main.isbn, main.title, main.abstract, main.keywords, main.rejected, main.later, main.notes"
+    __DEDUP_COLUMNS = ("doi_key", "title_key", "abstract_key")
+    # table and columns of the indexes used to filter entries and sources, named after the table and first column
+    __FILTER_INDEXES = (
+        (__MAIN_TABLE_NAME, ("rejected", "id")),
+        (__MAIN_TABLE_NAME, ("later", "id")),
+        (__SOURCES_TABLE_NAME, ("origin", "entry_id")),
+    )
+    # version of the schema since which the stored deduplication keys are those of the normalized fields
+    __NORMALIZED_VERSION = 7
+    __INSERT_SOURCE_COMMAND = "INSERT OR IGNORE INTO " + __SOURCES_TABLE_NAME + " VALUES (?, ?, ?)"
+    __INSERT_MAIN_COMMAND = (
+        "INSERT INTO "
+        + __MAIN_TABLE_NAME
+        + " ('id', 'doi', 'isbn', 'title', 'abstract', 'keywords', 'rejected', 'later', 'notes', 'doi_key', 'title_key', 'abstract_key')"
+        + " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    )
 
     def __init__(self, database: str) -> None:
-        """ Constructor. Connects to the database and creates the main table if not present
+        """ Constructor. Connects to the database and creates or upgrades its schema (see database.migrations)
 
         Args:
             database (str):Path to the database
         """
         self.connection = sqlite3.connect(database)
-        cursor = self.connection.cursor()
+        self.bulk = None
+        self.near_duplicates = None
+        self.metrics = LoadMetrics()
+
+        # the order of the steps must never change, new steps are added at the end
+        migrations.migrate(
+            self.connection,
+            [
+                self.__create_main_table,
+                self.__add_dedup_keys,
+                self.__create_sources_table,
+                self.__create_search_table,
+                self.__create_filter_indexes,
+                Manifest.create_tables,
+                self.__normalize_dedup_keys,
+                Checkpoints.create_tables,
+            ],
+        )
+        self.manifest = Manifest(self.connection)
+        self.checkpoints = Checkpoints(self.connection)
 
-        # Create the main table
+    def __create_main_table(self, cursor: sqlite3.Cursor) -> None:
+        """ Create the main table if not present
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+        """
         cursor.execute(
             "CREATE TABLE IF NOT EXISTS "
             + Sqlite3.__MAIN_TABLE_NAME
             + "(id INTEGER PRIMARY KEY, doi TEXT(255), isbn TEXT(25), title TEXT(255), abstract TEXT, keywords TEXT, rejected TINYINT, later BOOL, notes TEXT)"
         )
 
-        self.connection.commit()
+    def __normalize_dedup_keys(self, cursor: sqlite3.Cursor) -> None:
+        """ Update the deduplication keys of the existing rows to the ones of their normalized fields (see
+        model.normalization), as entries are normalized before being inserted. The stored fields are not changed, so
+        the existing entries keep their text as loaded. Only the rows whose keys change are updated
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+        """
+        rows = cursor.execute(
+            "SELECT id, doi, isbn, title, abstract, keywords, doi_key, title_key, abstract_key FROM "
+            + Sqlite3.__MAIN_TABLE_NAME
+        ).fetchall()
+
+        updates = []
+        for id, *values in rows:
+            resource = ResourceData(*(value if value is not None else "" for value in values[:5]))
+            normalize_resource(resource)
+            keys = dedup.get_keys(resource)
+            if list(keys) != values[5:]:
+                updates.append(list(keys) + [id])
+
+        cursor.executemany(
+            "UPDATE "
+            + Sqlite3.__MAIN_TABLE_NAME
+            + " SET doi_key = ?, title_key = ?, abstract_key = ? WHERE id = ?",
+            updates,
+        )
+
+    def __create_filter_indexes(self, cursor: sqlite3.Cursor) -> None:
+        """ Create the indexes used to filter entries by their state and sources by their origin. The indexes include
+        the ID, so the IDs of the filtered entries are read from the index without accessing the tables
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+        """
+        for table, columns in Sqlite3.__FILTER_INDEXES:
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS "
+                + table
+                + "_"
+                + columns[0]
+                + " ON "
+                + table
+                + " ("
+                + ", ".join(columns)
+                + ")"
+            )
+
+    def __create_search_table(self, cursor: sqlite3.Cursor) -> None:
+        """ Create the full-text search table (FTS5) over the title, abstract and keywords of the main table if not present.
+        The table does not store the texts, it only indexes the main table and is kept in sync with triggers. The index
+        is built for the entries already present
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+        """
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+            (Sqlite3.__SEARCH_TABLE_NAME,),
+        ).fetchone()
+
+        cursor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS "
+            + Sqlite3.__SEARCH_TABLE_NAME
+            + " USING fts5(title, abstract, keywords, content='"
+            + Sqlite3.__MAIN_TABLE_NAME
+            + "', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        self.__create_search_triggers(cursor)
+
+        if exists is None:
+            self.__rebuild_search_table(cursor)
+
+    def __create_search_triggers(self, cursor: sqlite3.Cursor) -> None:
+        """ Create the triggers which keep the full-text search table in sync with the main table if not present
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+        """
+        insert_new = (
+            "INSERT INTO "
+            + Sqlite3.__SEARCH_TABLE_NAME
+            + "(rowid, title, abstract, keywords) VALUES (new.id, new.title, new.abstract, new.keywords);"
+        )
+        delete_old = (
+            "INSERT INTO "
+            + Sqlite3.__SEARCH_TABLE_NAME
+            + "("
+            + Sqlite3.__SEARCH_TABLE_NAME
+            + ", rowid, title, abstract, keywords) VALUES ('delete', old.id, old.title, old.abstract, old.keywords);"
+        )
+        triggers = {
+            "insert": "AFTER INSERT ON " + Sqlite3.__MAIN_TABLE_NAME + " BEGIN " + insert_new + " END",
+            "delete": "AFTER DELETE ON " + Sqlite3.__MAIN_TABLE_NAME + " BEGIN " + delete_old + " END",
+            # changes of the state of the entry (rejected, notes, ...) do not touch the index
+            "update": "AFTER UPDATE OF title, abstract, keywords ON "
+            + Sqlite3.__MAIN_TABLE_NAME
+            + " BEGIN "
+            + delete_old
+            + " "
+            + insert_new
+            + " END",
+        }
+        for name, body in triggers.items():
+            cursor.execute(
+                "CREATE TRIGGER IF NOT EXISTS " + Sqlite3.__SEARCH_TABLE_NAME + "_" + name + " " + body
+            )
+
+    def __rebuild_search_table(self, cursor: sqlite3.Cursor) -> None:
+        """ Build the full-text search table again from all the entries of the main table
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+        """
+        cursor.execute(
+            "INSERT INTO "
+            + Sqlite3.__SEARCH_TABLE_NAME
+            + "("
+            + Sqlite3.__SEARCH_TABLE_NAME
+            + ") VALUES ('rebuild')"
+        )
+
+    def __create_sources_table(self, cursor: sqlite3.Cursor) -> None:
+        """ Create the sources table if not present. The sources stored in one table per origin, as done by older
+        versions, are moved into it and their tables are removed
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+        """
+        # tables of older versions are named after the origin and have only an id and a link column
+        origin_tables = {}
+        for table_tuple in cursor.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall():
+            columns = [
+                column[1] for column in cursor.execute('PRAGMA table_info("' + table_tuple[0] + '")').fetchall()
+            ]
+            if columns == ["id", "link"]:
+                origin_tables[table_tuple[0]] = table_tuple[0]
+
+        # an origin could have the same name as the new table
+        if Sqlite3.__SOURCES_TABLE_NAME in origin_tables:
+            cursor.execute(
+                "ALTER TABLE " + Sqlite3.__SOURCES_TABLE_NAME + " RENAME TO " + Sqlite3.__SOURCES_TABLE_NAME + "_origin"
+            )
+            del origin_tables[Sqlite3.__SOURCES_TABLE_NAME]
+            origin_tables[Sqlite3.__SOURCES_TABLE_NAME + "_origin"] = Sqlite3.__SOURCES_TABLE_NAME
 
-        # Get existing table names
-        self.tables = [
-            table_tuple[0]
-            for table_tuple in cursor.execute(
-                "SELECT name FROM sqlite_master WHERE type='table'"
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS "
+            + Sqlite3.__SOURCES_TABLE_NAME
+            + " (entry_id INTEGER, origin TEXT, link TEXT)"
+        )
+        self.__create_sources_index(cursor)
+
+        for table, origin in origin_tables.items():
+            cursor.execute(
+                "INSERT OR IGNORE INTO "
+                + Sqlite3.__SOURCES_TABLE_NAME
+                + ' SELECT id, ?, link FROM "'
+                + table
+                + '"',
+                (origin,),
+            )
+            cursor.execute('DROP TABLE "' + table + '"')
+
+    def __create_sources_index(self, cursor: sqlite3.Cursor) -> None:
+        """ Create the unique index of the sources table if not present, so a source is never stored twice for an entry
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+        """
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS "
+            + Sqlite3.__SOURCES_TABLE_NAME
+            + "_entry ON "
+            + Sqlite3.__SOURCES_TABLE_NAME
+            + " (entry_id, origin, link)"
+        )
+
+    def __add_dedup_keys(self, cursor: sqlite3.Cursor) -> None:
+        """ Add the deduplication key columns and their indexes to the main table if they are not present, filling them
+        for the already existing rows. Existing databases created without these keys are upgraded
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+        """
+        existing_columns = [
+            column[1]
+            for column in cursor.execute(
+                "PRAGMA table_info(" + Sqlite3.__MAIN_TABLE_NAME + ")"
             ).fetchall()
         ]
-        self.tables.remove(Sqlite3.__MAIN_TABLE_NAME)
+
+        missing_columns = [
+            column for column in Sqlite3.__DEDUP_COLUMNS if column not in existing_columns
+        ]
+        for column in missing_columns:
+            cursor.execute(
+                "ALTER TABLE " + Sqlite3.__MAIN_TABLE_NAME + " ADD COLUMN " + column + " TEXT"
+            )
+
+        if len(missing_columns) != 0:
+            rows = cursor.execute(
+                "SELECT id, doi, title, abstract FROM " + Sqlite3.__MAIN_TABLE_NAME
+            ).fetchall()
+            cursor.executemany(
+                "UPDATE "
+                + Sqlite3.__MAIN_TABLE_NAME
+                + " SET doi_key = ?, title_key = ?, abstract_key = ? WHERE id = ?",
+                (
+                    (dedup.doi_key(doi), dedup.title_key(title), dedup.abstract_key(abstract), id)
+                    for id, doi, title, abstract in rows
+                ),
+            )
+
+        self.__create_dedup_indexes(cursor)
+
+    def __create_dedup_indexes(self, cursor: sqlite3.Cursor) -> None:
+        """ Create the indexes of the deduplication keys if they do not exist
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+        """
+        for column in Sqlite3.__DEDUP_COLUMNS:
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS "
+                + Sqlite3.__MAIN_TABLE_NAME
+                + "_"
+                + column
+                + " ON "
+                + Sqlite3.__MAIN_TABLE_NAME
+                + "("
+                + column
+                + ")"
+            )
 
     def __entry_factory(cursor: sqlite3.Cursor, row: tuple[any,...]) -> tuple[int, Entry]:
         """ Row factory for sqlite3. When fetching from the database, this function transform the default return from the database (tuple of colums)
@@ -52,10 +379,11 @@ class Sqlite3(Connector):
         """
         
         sources = []
-        # sources, if present in the fetch command, should be located after the rest of the information
-        for column in range(Columns.UNKNOWN, len(cursor.description)):
-            if row[column] is not None:
-                sources.append(EntrySource(cursor.description[column][0], row[column]))
+        # sources, if present in the fetch command, are aggregated in a column after the rest of the information
+        if len(row) > Columns.SOURCES and row[Columns.SOURCES] is not None:
+            for source in row[Columns.SOURCES].split(Sqlite3.__SOURCE_SEPARATOR):
+                origin, link = source.split(Sqlite3.__ORIGIN_SEPARATOR, 1)
+                sources.append(EntrySource(origin, link))
 
         return (
             row[Columns.ID],
@@ -76,93 +404,513 @@ class Sqlite3(Connector):
             ),
         )
 
-    def insert(self, entries: list[Entry]) -> None:
-        """ Insert entries into the database
+    def insert(self, entries: Iterable[Entry], chunk_size: int = 10000) -> None:
+        """ Insert entries into the database. Entries are consumed as they come, so any iterable can be used, and the
+        changes are committed every chunk_size entries. If a bulk load was started, the entries are inserted using the
+        bulk path
 
         Args:
-            entries (list[Entry]): Entries to insert into the database
+            entries (Iterable[Entry]): Entries to insert into the database
+            chunk_size (int, optional): Number of entries inserted between commits. Defaults to 10000.
         """
+        if self.bulk is not None:
+            self.__bulk_insert(entries)
+            return
+
         cursor = self.connection.cursor()
+        lookup_cursor = self.connection.cursor()
+        origin = None
         new_entries = 0
-        for entry in entries:
-            # add source tables if they do not exist
-            for source in entry.sources:
-                if source.origin not in self.tables:
-                    cursor.execute(
-                        "CREATE TABLE IF NOT EXISTS "
-                        + source.origin
-                        + " (id INT UNSIGNED, link TEXT)"
-                    )
-                    self.tables.append(source.origin)
-
-            data = (
-                None,
-                entry.resource.doi,
-                entry.resource.isbn,
-                entry.resource.title,
-                entry.resource.abstract,
-                entry.resource.keywords,
-                entry.state.rejected,
-                entry.state.save_for_later,
-                entry.state.notes,
-            )
+        for count, entry in enumerate(entries, 1):
+            if origin is None and len(entry.sources) != 0:
+                origin = entry.sources[0].origin
+
+            start = time.perf_counter()
+            keys = dedup.get_keys(entry.resource)
+            normalized = time.perf_counter()
 
             # insert into the main table only if not present already
-            existing_row = self.get_existing_row(entry, cursor) 
-            if existing_row is None:
+            id_to_insert, matched = self.__find_existing_id(lookup_cursor, keys)
+            self.metrics.add_lookup(keys, matched)
+            if id_to_insert is None:
+                id_to_insert, signature = self.__find_near_duplicate(entry)
+            looked_up = time.perf_counter()
+
+            if id_to_insert is None:
                 cursor.execute(
-                    "INSERT INTO "
-                    + Sqlite3.__MAIN_TABLE_NAME
-                    + " ('id', 'doi', 'isbn', 'title', 'abstract', 'keywords', 'rejected', 'later', 'notes') VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    data,
+                    Sqlite3.__INSERT_MAIN_COMMAND,
+                    Sqlite3.__main_row(None, entry, keys),
                 )
+                id_to_insert = cursor.lastrowid
+                if self.near_duplicates is not None:
+                    self.near_duplicates.add(id_to_insert, signature)
                 new_entries = new_entries + 1
 
-            # insert the information into the source table
-            id_to_insert = existing_row[0] if existing_row is not None else cursor.lastrowid
-            for source in entry.sources:
-                cursor.execute(
-                    "INSERT INTO " + source.origin + " VALUES (?, ?)",
-                    (id_to_insert, source.link),
+            # insert the information into the sources table
+            cursor.executemany(
+                Sqlite3.__INSERT_SOURCE_COMMAND,
+                ((id_to_insert, source.origin, source.link) for source in entry.sources),
+            )
+
+            if count % chunk_size == 0:
+                self.connection.commit()
+
+            self.metrics.add_time("normalization", normalized - start)
+            self.metrics.add_time("dedup", looked_up - normalized)
+            self.metrics.add_time("insert", time.perf_counter() - looked_up)
+
+        start = time.perf_counter()
+        self.connection.commit()
+        self.metrics.add_time("insert", time.perf_counter() - start)
+        self.metrics.new_entries += new_entries
+
+        Sqlite3.__print_inserted(origin, new_entries)
+
+    def start_bulk(self, batch_size: int = 10000) -> None:
+        """ Start a bulk load. Until end_bulk is called, insert keeps the deduplication keys of the database in memory
+        and writes the rows in batches. The deduplication, filter and sources indexes and the triggers of the full-text
+        search table are dropped, so they are not maintained row by row. The database is not synced to disk during the
+        bulk load, so a crash can leave it corrupted or without those indexes
+
+        Args:
+            batch_size (int, optional): Number of rows written to the database at once. Defaults to 10000.
+        """
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+
+        self.bulk = BulkLoad(
+            batch_size,
+            cursor.execute("PRAGMA synchronous").fetchone()[0],
+            cursor.execute("PRAGMA journal_mode").fetchone()[0],
+        )
+
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA journal_mode=WAL")
+
+        for row in cursor.execute(
+            "SELECT id, doi_key, title_key, abstract_key FROM " + Sqlite3.__MAIN_TABLE_NAME + " ORDER BY id"
+        ):
+            self.bulk.add_keys(row[0], row[1:])
+            self.bulk.next_id = row[0] + 1
+
+        # indexes and triggers are created again once the bulk load finishes
+        for column in Sqlite3.__DEDUP_COLUMNS:
+            cursor.execute("DROP INDEX IF EXISTS " + Sqlite3.__MAIN_TABLE_NAME + "_" + column)
+        for table, columns in Sqlite3.__FILTER_INDEXES:
+            cursor.execute("DROP INDEX IF EXISTS " + table + "_" + columns[0])
+        cursor.execute("DROP INDEX IF EXISTS " + Sqlite3.__SOURCES_TABLE_NAME + "_entry")
+
+        triggers = cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (Sqlite3.__MAIN_TABLE_NAME,)
+        ).fetchall()
+        for (trigger,) in triggers:
+            if trigger.startswith(Sqlite3.__SEARCH_TABLE_NAME + "_"):
+                cursor.execute("DROP TRIGGER " + trigger)
+
+        self.connection.commit()
+
+    def end_bulk(self) -> None:
+        """ Finish a bulk load. Pending rows are written, the dropped indexes and triggers are created again, the
+        full-text search table is rebuilt and the previous synchronization settings are restored. As the sources were
+        inserted without their unique index, the repeated ones are removed before creating it
+        """
+        if self.bulk is None:
+            return
+
+        cursor = self.connection.cursor()
+        self.__flush_bulk(cursor)
+
+        # as in the unique index, sources with a null column are never repeated
+        cursor.execute(
+            "DELETE FROM "
+            + Sqlite3.__SOURCES_TABLE_NAME
+            + " WHERE rowid NOT IN (SELECT MIN(rowid) FROM "
+            + Sqlite3.__SOURCES_TABLE_NAME
+            + " GROUP BY entry_id, origin, link)"
+            + " AND entry_id IS NOT NULL AND origin IS NOT NULL AND link IS NOT NULL"
+        )
+        self.__create_sources_index(cursor)
+        self.__create_dedup_indexes(cursor)
+        self.__create_filter_indexes(cursor)
+        self.__create_search_triggers(cursor)
+        self.__rebuild_search_table(cursor)
+        self.connection.commit()
+
+        cursor.execute("PRAGMA journal_mode=" + self.bulk.journal_mode)
+        cursor.execute("PRAGMA synchronous=" + str(self.bulk.synchronous))
+        self.bulk = None
+
+    def __bulk_insert(self, entries: Iterable[Entry]) -> None:
+        """ Insert entries during a bulk load. Duplicates are detected using the keys kept in memory
+
+        Args:
+            entries (Iterable[Entry]): Entries to insert into the database
+        """
+        cursor = self.connection.cursor()
+        origin = None
+        new_entries = 0
+        for entry in entries:
+            if origin is None and len(entry.sources) != 0:
+                origin = entry.sources[0].origin
+
+            start = time.perf_counter()
+            keys = dedup.get_keys(entry.resource)
+            normalized = time.perf_counter()
+
+            id_to_insert = self.bulk.get_existing_id(keys)
+            if id_to_insert is not None:
+                self.metrics.add_lookup(
+                    keys, tuple(ids.get(key) == id_to_insert for ids, key in zip(self.bulk.ids_by_key, keys))
+                )
+            else:
+                self.metrics.add_lookup(keys, None)
+                id_to_insert, signature = self.__find_near_duplicate(entry)
+            looked_up = time.perf_counter()
+
+            if id_to_insert is None:
+                id_to_insert = self.bulk.next_id
+                self.bulk.next_id += 1
+                self.bulk.main_rows.append(Sqlite3.__main_row(id_to_insert, entry, keys))
+                self.bulk.add_keys(id_to_insert, keys)
+                if self.near_duplicates is not None:
+                    self.near_duplicates.add(id_to_insert, signature)
+                new_entries = new_entries + 1
+
+            self.bulk.source_rows.extend(
+                (id_to_insert, source.origin, source.link) for source in entry.sources
+            )
+
+            if len(self.bulk.main_rows) + len(self.bulk.source_rows) >= self.bulk.batch_size:
+                self.__flush_bulk(cursor)
+
+            self.metrics.add_time("normalization", normalized - start)
+            self.metrics.add_time("dedup", looked_up - normalized)
+            self.metrics.add_time("insert", time.perf_counter() - looked_up)
+
+        start = time.perf_counter()
+        self.__flush_bulk(cursor)
+        self.metrics.add_time("insert", time.perf_counter() - start)
+        self.metrics.new_entries += new_entries
+
+        Sqlite3.__print_inserted(origin, new_entries)
+
+    def __print_inserted(origin: str | None, new_entries: int) -> None:
+        """ Print the number of new entries inserted from an origin
+
+        Args:
+            origin (str | None): Origin of the inserted entries, None if no entry was inserted
+            new_entries (int): Number of new entries
+        """
+        print((origin if origin is not None else "(no entries)") + " -> " + str(new_entries))
+
+    def use_near_duplicates(self, threshold: float = 0.8) -> None:
+        """ Enable the near-duplicate detection when inserting entries. Besides the exact comparison of the
+        deduplication keys, an entry is considered to exist if its title and abstract are similar enough to an
+        existing entry (see database.near_duplicates). Existing entries not indexed yet are added to the index
+
+        Args:
+            threshold (float, optional): Minimum similarity to consider two entries the same. Defaults to 0.8.
+        """
+        self.near_duplicates = NearDuplicateIndex(self.connection, threshold)
+        self.near_duplicates.add_missing(
+            self.connection.execute("SELECT id, title, abstract FROM " + Sqlite3.__MAIN_TABLE_NAME)
+        )
+
+    def find_near_duplicates(self, threshold: float = 0.8) -> list[tuple[int, int, float]]:
+        """ Find all pairs of near-duplicated entries in the database. Entries are indexed if needed
+
+        Args:
+            threshold (float, optional): Minimum similarity to consider two entries near duplicates. Defaults to 0.8.
+
+        Returns:
+            list[tuple[int, int, float]]: ID of the first entry, ID of the second entry and their estimated similarity
+        """
+        self.use_near_duplicates(threshold)
+        return self.near_duplicates.find_pairs()
+
+    def merge_entries(self, id: int, duplicate_id: int, save: bool = False) -> bool:
+        """ Merge an entry into another one. The sources of the duplicate are moved to the entry and the duplicate is
+        removed. The information of the kept entry is not changed. If the kept entry was not reviewed, it gets the
+        review state (rejected, later and notes) of the duplicate, so no decision is lost. If both were reviewed with
+        different states, they are not merged
+
+        Args:
+            id (int): ID of the entry to keep
+            duplicate_id (int): ID of the entry to remove
+            save (bool, optional): Save into the database now or no. Defaults to False.
+
+        Returns:
+            bool: True if the entries were merged, False if their review states conflict
+        """
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+        states = {
+            row[0]: (row[1] or 0, bool(row[2]), row[3] or "")
+            for row in cursor.execute(
+                "SELECT id, rejected, later, notes FROM " + Sqlite3.__MAIN_TABLE_NAME + " WHERE id IN (?, ?)",
+                (id, duplicate_id),
+            )
+        }
+        not_reviewed = (0, False, "")
+        state, duplicate_state = states.get(id, not_reviewed), states.get(duplicate_id, not_reviewed)
+        if duplicate_state not in (not_reviewed, state):
+            if state != not_reviewed:
+                return False
+
+            cursor.execute(
+                "UPDATE " + Sqlite3.__MAIN_TABLE_NAME + " SET rejected = ?, later = ?, notes = ? WHERE id = ?",
+                duplicate_state + (id,),
+            )
+
+        # sources already present in the kept entry are ignored and deleted
+        cursor.execute(
+            "UPDATE OR IGNORE " + Sqlite3.__SOURCES_TABLE_NAME + " SET entry_id = ? WHERE entry_id = ?",
+            (id, duplicate_id),
+        )
+        cursor.execute(
+            "DELETE FROM " + Sqlite3.__SOURCES_TABLE_NAME + " WHERE entry_id = ?", (duplicate_id,)
+        )
+
+        cursor.execute("DELETE FROM " + Sqlite3.__MAIN_TABLE_NAME + " WHERE id = ?", (duplicate_id,))
+
+        if self.near_duplicates is not None:
+            self.near_duplicates.remove(duplicate_id)
+
+        if save:
+            self.connection.commit()
+
+        return True
+
+    def is_file_loaded(self, path: str) -> bool:
+        """ Check if a file was loaded into the database and did not change since then (see database.manifest)
+
+        Args:
+            path (str): Path to the file
+
+        Returns:
+            bool: True if the file was loaded with the same content
+        """
+        return self.manifest.is_loaded(path)
+
+    def track_records(self, path: str, entries: Iterable[Entry], skip_loaded: bool = True) -> Iterator[Entry]:
+        """ Keep the fingerprint of the entries loaded from a file, so they are not processed again if the file is
+        loaded again. The fingerprints are committed together with the entries
+
+        Args:
+            path (str): Path to the file
+            entries (Iterable[Entry]): Entries of the file
+            skip_loaded (bool, optional): Skip the entries loaded from the file before. Defaults to True.
+
+        Yields:
+            Iterator[Entry]: Entries not loaded from the file before, or all of them if skip_loaded is False
+        """
+        return self.manifest.track_records(path, entries, skip_loaded)
+
+    def set_file_loaded(self, path: str) -> None:
+        """ Record that a file was loaded with its current content
+
+        Args:
+            path (str): Path to the file
+        """
+        self.manifest.set_loaded(path)
+
+    def get_checkpoint(self, provider: str, query: str) -> tuple[dict, bool] | None:
+        """ Get the checkpoint of a search in a remote source (see database.checkpoints)
+
+        Args:
+            provider (str): Name of the remote source
+            query (str): Query of the search, as sent to the remote source
+
+        Returns:
+            tuple[dict, bool] | None: Checkpoint and whether all the pages were loaded, None if the search was never
+            loaded
+        """
+        return self.checkpoints.get(provider, query)
+
+    def set_checkpoint(self, provider: str, query: str, checkpoint: dict, complete: bool = False) -> None:
+        """ Set the checkpoint of a search in a remote source. It is committed together with the next inserted entries
+
+        Args:
+            provider (str): Name of the remote source
+            query (str): Query of the search, as sent to the remote source
+            checkpoint (dict): State needed to request the next page
+            complete (bool, optional): All the pages were loaded. Defaults to False.
+        """
+        self.checkpoints.set(provider, query, checkpoint, complete)
+
+    @staticmethod
+    def read_dedup_keys(database: str) -> Iterator[tuple[str | None, str | None, str | None]]:
+        """ Get the deduplication keys of all the entries of an existing database (see database.dedup). The database
+        is opened read only and no migration is run. If its schema is older than the stored keys of normalized
+        fields, the keys are computed in memory as the migrations would
+
+        Args:
+            database (str): Path to the database
+
+        Yields:
+            Iterator[tuple[str | None, str | None, str | None]]: DOI, title and abstract keys of each entry
+        """
+        connection = sqlite3.connect("file:" + urllib.parse.quote(os.path.abspath(database)) + "?mode=ro", uri=True)
+        try:
+            tables = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            if Sqlite3.__MAIN_TABLE_NAME not in tables:
+                return
+
+            if migrations.get_version(connection) >= Sqlite3.__NORMALIZED_VERSION:
+                yield from connection.execute(
+                    "SELECT " + ", ".join(Sqlite3.__DEDUP_COLUMNS) + " FROM " + Sqlite3.__MAIN_TABLE_NAME
                 )
+                return
+
+            for fields in connection.execute(
+                "SELECT doi, isbn, title, abstract, keywords FROM " + Sqlite3.__MAIN_TABLE_NAME
+            ):
+                resource = ResourceData(*(field if field is not None else "" for field in fields))
+                normalize_resource(resource)
+                yield dedup.get_keys(resource)
+        finally:
+            connection.close()
+
+    def get_metrics(self) -> LoadMetrics:
+        """ Get the metrics of the entries inserted since the connector was created
+
+        Returns:
+            LoadMetrics: Metrics of the load
+        """
+        return self.metrics
+
+    def __find_near_duplicate(self, entry: Entry) -> tuple[int | None, any]:
+        """ Look for a near duplicate of an entry if the near-duplicate detection is enabled
+
+        Args:
+            entry (Entry): Entry to look for
+
+        Returns:
+            tuple[int | None, any]: ID of the near duplicate, None if there is none, and the signature of the entry to add it to the index
+        """
+        if self.near_duplicates is None:
+            return (None, None)
+
+        signature = self.near_duplicates.get_signature(entry.resource)
+        near_duplicate = self.near_duplicates.find(signature)
+        if near_duplicate is None:
+            return (None, signature)
+
+        self.metrics.add_near_duplicate()
+        return (near_duplicate[0], signature)
 
+    def __flush_bulk(self, cursor: sqlite3.Cursor) -> None:
+        """ Write the rows pending in the bulk load into the database
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database
+        """
+        cursor.executemany(Sqlite3.__INSERT_MAIN_COMMAND, self.bulk.main_rows)
+        cursor.executemany(Sqlite3.__INSERT_SOURCE_COMMAND, self.bulk.source_rows)
         self.connection.commit()
 
-        print(entries[0].sources[0].origin + " -> " + str(new_entries))
+        self.bulk.main_rows = []
+        self.bulk.source_rows = []
+
+    def __main_row(id: int | None, entry: Entry, keys: tuple[str | None, str | None, str | None]) -> tuple:
+        """ Get the values of an entry to insert into the main table
+
+        Args:
+            id (int | None): ID of the row, None to let the database assign it
+            entry (Entry): Entry to insert
+            keys (tuple[str | None, str | None, str | None]): Deduplication keys of the entry
+
+        Returns:
+            tuple: Values in the order of the insert command of the main table
+        """
+        return (
+            id,
+            entry.resource.doi,
+            entry.resource.isbn,
+            entry.resource.title,
+            entry.resource.abstract,
+            entry.resource.keywords,
+            entry.state.rejected,
+            entry.state.save_for_later,
+            entry.state.notes,
+        ) + keys
 
-    def get_existing_row(self, entry: Entry, cursor: sqlite3.Cursor) -> tuple[int, Entry] | None:
+    def get_existing_row(
+        self, entry: Entry, cursor: sqlite3.Cursor, keys: tuple[str | None, str | None, str | None] | None = None
+    ) -> tuple[int, Entry] | None:
         """ Get a row based on an Entry if it exist. A row is considered to exists if it has one of the following values equal to another in the database:
           doi, title, abstract. ISBN is not used since sometime scientific resources are in the same book having the same ISBN.
+        The values are compared using their normalized keys (see database.dedup), which are indexed in the main table.
         If many items exists in the database that are equal, the first one is returned. 
 
         Args:
             entry (Entry): Entry to look for in the database
             cursor (sqlite3.Cursor): Cursor of the database
+            keys (tuple[str | None, str | None, str | None] | None, optional): Already calculated keys of the entry. Defaults to None,
+            in which case they are calculated from the entry
 
         Returns:
             tuple[int, Entry] | None: The ID and entry if the Entry was already present, None otherwise.
         """
         cursor.row_factory = Sqlite3.__entry_factory
 
+        if keys is None:
+            keys = dedup.get_keys(entry.resource)
+
         fields_to_check = []
-        if entry.resource.doi != '':
-            fields_to_check.append(' doi = "' + entry.resource.doi.replace('"', '""')  + '"')
-        if entry.resource.title != '':
-            fields_to_check.append(' title = "' + entry.resource.title.replace('"', '""')  + '"')
-        if entry.resource.abstract != '':
-            fields_to_check.append(' abstract = "' + entry.resource.abstract.replace('"', '""')  + '"')
-
-        command = (  'SELECT * ' +
+        values = []
+        for column, key in zip(Sqlite3.__DEDUP_COLUMNS, keys):
+            if key is not None:
+                fields_to_check.append(" " + column + " = ?")
+                values.append(key)
+
+        if len(fields_to_check) == 0:
+            return None
+
+        command = (  'SELECT ' + Sqlite3.__MAIN_COLUMNS +
                     ' FROM ' + Sqlite3.__MAIN_TABLE_NAME +
                     ' WHERE' +
-                    " OR ".join(fields_to_check) +
-                    ' COLLATE NOCASE')
-        existing_entries = cursor.execute(command).fetchall()
-        if len(existing_entries) != 0:
-            # return first row found
-            return existing_entries[0]
-        
-        return None
+                    " OR".join(fields_to_check) +
+                    ' ORDER BY id LIMIT 1')
+        return cursor.execute(command, values).fetchone()
+
+    def __find_existing_id(
+        self, cursor: sqlite3.Cursor, keys: tuple[str | None, str | None, str | None]
+    ) -> tuple[int | None, tuple[bool, bool, bool] | None]:
+        """ Get the ID of the first row sharing one of the deduplication keys, as get_existing_row does, without
+        building its entry
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the database, without row factory
+            keys (tuple[str | None, str | None, str | None]): Deduplication keys to look for
+
+        Returns:
+            tuple[int | None, tuple[bool, bool, bool] | None]: ID of the existing row and which keys it shares, None if no row shares any key
+        """
+        fields_to_check = []
+        values = []
+        for column, key in zip(Sqlite3.__DEDUP_COLUMNS, keys):
+            if key is not None:
+                fields_to_check.append(" " + column + " = ?")
+                values.append(key)
+
+        if len(fields_to_check) == 0:
+            return (None, None)
+
+        command = (
+            "SELECT id, "
+            + ", ".join(column + " = ?" for column in Sqlite3.__DEDUP_COLUMNS)
+            + " FROM "
+            + Sqlite3.__MAIN_TABLE_NAME
+            + " WHERE"
+            + " OR".join(fields_to_check)
+            + " ORDER BY id LIMIT 1"
+        )
+        row = cursor.execute(command, list(keys) + values).fetchone()
+        if row is None:
+            return (None, None)
+
+        return (row[0], tuple(matched == 1 for matched in row[1:]))
 
     def get_entries(self, rejected: [int]) -> list[tuple[int, Entry]]:
         """ Get all entries that are not reviewed yet (rejected = 0)
@@ -170,26 +918,136 @@ class Sqlite3(Connector):
         Returns:
           list[tuple[int, Entry]]: List of ID and entries which are not reviwied yet
         """
+        where_statement = ""
+        if len(rejected) > 0:
+            where_statement = " WHERE rejected IN (" + ", ".join(str(r) for r in rejected) + ")"
+
+        return self.__select_entries(where_statement, ())
+
+    def get_entry_ids(self, rejected: [int], search: str | None = None) -> array:
+        """ Get the IDs of all entries with the given rejected values, ordered by ID
+
+        Args:
+            rejected ([int]): Rejected values of the entries. All entries are returned if empty
+            search (str | None, optional): Full-text query (FTS5 syntax) the entries must match. Defaults to None, no filtering.
+
+        Returns:
+            array: IDs of the entries
+        """
         cursor = self.connection.cursor()
-        cursor.row_factory = Sqlite3.__entry_factory
+        cursor.row_factory = None
 
-        links_columns = ""
-        links_inner_joins = ""
-        for table in self.tables:
-            links_columns += ", " + table + ".link AS " + table
-            links_inner_joins += " LEFT JOIN " + table + " ON main.id=" + table + ".id"
+        conditions = []
+        parameters = ()
+        if len(rejected) > 0:
+            conditions.append("rejected IN (" + ", ".join(str(r) for r in rejected) + ")")
+
+        if search is not None:
+            conditions.append(
+                "id IN (SELECT rowid FROM "
+                + Sqlite3.__SEARCH_TABLE_NAME
+                + " WHERE "
+                + Sqlite3.__SEARCH_TABLE_NAME
+                + " MATCH ?)"
+            )
+            parameters = (search,)
 
         where_statement = ""
-        if len(rejected) > 0:
-            where_statement = " WHERE rejected IN (" + ", ".join(str(r) for r in rejected) + ")"
+        if len(conditions) > 0:
+            where_statement = " WHERE " + " AND ".join(conditions)
+
+        return array(
+            "q",
+            (
+                row[0]
+                for row in cursor.execute(
+                    "SELECT id FROM " + Sqlite3.__MAIN_TABLE_NAME + where_statement + " ORDER BY id",
+                    parameters,
+                )
+            ),
+        )
+
+    def search(self, text: str, limit: int = 100) -> list[tuple[int, float, str]]:
+        """ Search entries by their title, abstract and keywords using the full-text index. Results are ranked with
+        bm25, giving more weight to matches in the title and keywords than in the abstract
+
+        Args:
+            text (str): Full-text query (FTS5 syntax), e.g. 'plc AND (software OR program)' or '"power line"'
+            limit (int, optional): Maximum number of results. Defaults to 100.
+
+        Returns:
+            list[tuple[int, float, str]]: ID, rank (lower is better) and snippet of the matching text of each entry, best ranked first
+        """
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+
+        return cursor.execute(
+            "SELECT rowid, bm25("
+            + Sqlite3.__SEARCH_TABLE_NAME
+            + ", "
+            + Sqlite3.__SEARCH_WEIGHTS
+            + ") AS rank, snippet("
+            + Sqlite3.__SEARCH_TABLE_NAME
+            + ", -1, '[', ']', '...', 16) FROM "
+            + Sqlite3.__SEARCH_TABLE_NAME
+            + " WHERE "
+            + Sqlite3.__SEARCH_TABLE_NAME
+            + " MATCH ? ORDER BY rank LIMIT ?",
+            (text, limit),
+        ).fetchall()
+
+    def get_rejected_by_id(self) -> dict[int, int]:
+        """ Get the rejected value of every entry
+
+        Returns:
+            dict[int, int]: Rejected value of each entry ID
+        """
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+        return dict(cursor.execute("SELECT id, rejected FROM " + Sqlite3.__MAIN_TABLE_NAME))
+
+    def get_entries_by_id(self, ids: list[int]) -> list[tuple[int, Entry]]:
+        """ Get the entries with the given IDs
+
+        Args:
+            ids (list[int]): IDs of the entries to get
+
+        Returns:
+            list[tuple[int, Entry]]: ID and entries found, in no particular order
+        """
+        if len(ids) == 0:
+            return []
+
+        return self.__select_entries(
+            " WHERE main.id IN (" + ", ".join("?" * len(ids)) + ")", tuple(ids)
+        )
+
+    def __select_entries(self, where_statement: str, parameters: tuple) -> list[tuple[int, Entry]]:
+        """ Get the entries, together with their sources, which fulfill a condition. The sources of each entry are
+        aggregated in a single column, so each entry is returned once
+
+        Args:
+            where_statement (str): WHERE clause of the query, empty to get all entries
+            parameters (tuple): Values of the placeholders in the WHERE clause
+
+        Returns:
+            list[tuple[int, Entry]]: List of ID and entries
+        """
+        cursor = self.connection.cursor()
+        cursor.row_factory = Sqlite3.__entry_factory
 
         return cursor.execute(
-            "SELECT main.id, main.doi, main.isbn, main.title, main.abstract, main.keywords, main.rejected, main.later, main.notes"
-            + links_columns
+            "SELECT "
+            + Sqlite3.__MAIN_COLUMNS
+            + ", group_concat(sources.origin || ? || sources.link, ?)"
             + " FROM "
             + Sqlite3.__MAIN_TABLE_NAME
-            + links_inner_joins
+            + " LEFT JOIN "
+            + Sqlite3.__SOURCES_TABLE_NAME
+            + " ON sources.entry_id = main.id"
             + where_statement
+            + " GROUP BY main.id",
+            (Sqlite3.__ORIGIN_SEPARATOR, Sqlite3.__SOURCE_SEPARATOR) + parameters,
         ).fetchall()
 
     def __update_field(self, id: int, field: str, value: str, save: bool = False):
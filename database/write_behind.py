@@ -0,0 +1,226 @@
+import json
+import logging
+import os
+import threading
+
+from database.connector import Connector
+from database.entry import EntryState
+
+__LOGGER__ = logging.getLogger(__name__)
+
+class WriteBehindQueue:
+    """ Queue of updates to the state of entries which are written to the database by a background thread, so the
+    caller never waits for the database. Updates to the same entry are coalesced in memory until they are written,
+    which happens periodically, when too many entries are pending and when the queue is closed.
+
+    Every update is also appended to a journal file next to the database. If the application stops before the updates
+    are written, they are recovered from the journal the next time a queue is created for the database.
+
+    Errors of the background thread are logged and the updates are kept to be written again later. The last error is
+    raised by the next call to flush or close.
+    """
+
+    # fields of EntryState which can be updated and the Connector method used to update each one
+    __UPDATE_METHODS = {
+        "rejected": Connector.update_rejected.__name__,
+        "save_for_later": Connector.update_save_for_later.__name__,
+        "notes": Connector.update_notes.__name__,
+    }
+
+    def __init__(self, database: str, flush_interval: float = 2.0, max_pending: int = 50) -> None:
+        """ Constructor. Recovers the updates from the journal if present and starts the background thread
+
+        Args:
+            database (str): Path to the database
+            flush_interval (float, optional): Maximum number of seconds an update waits before being written. Defaults to 2.0.
+            max_pending (int, optional): Number of pending entries which triggers a write. Defaults to 50.
+        """
+        self.database = database
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.journal_path = database + ".pending"
+
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        self.closed = False
+        self.error = None
+
+        self.__recover_journal()
+        self.journal = open(self.journal_path, "a", encoding="utf-8")
+
+        self.thread = threading.Thread(target=self.__run, name="write-behind", daemon=True)
+        self.thread.start()
+
+    def update_rejected(self, id: int, reason: int) -> None:
+        """ Queue an update of the rejected field of an entry
+
+        Args:
+            id (int): ID of the entry to update
+            reason (int): reason for rejection
+        """
+        self.__update(id, "rejected", reason)
+
+    def update_save_for_later(self, id: int, save_for_later: bool) -> None:
+        """ Queue an update of the save for later field of an entry
+
+        Args:
+            id (int): ID of the entry to update
+            save_for_later (bool): new value for the field of the entry
+        """
+        self.__update(id, "save_for_later", save_for_later)
+
+    def update_notes(self, id: int, notes: str) -> None:
+        """ Queue an update of the notes field of an entry
+
+        Args:
+            id (int): ID of the entry to update
+            notes (str): new description for the notes field of the entry
+        """
+        self.__update(id, "notes", notes)
+
+    def apply_pending(self, id: int, state: EntryState) -> None:
+        """ Apply the updates not written yet to the state of an entry. Useful when the entry was read from the
+        database after the updates were queued
+
+        Args:
+            id (int): ID of the entry
+            state (EntryState): State of the entry to update
+        """
+        with self.lock:
+            for field, value in self.pending.get(id, {}).items():
+                setattr(state, field, value)
+
+    def flush(self) -> None:
+        """ Wake up the background thread to write the pending updates now
+
+        Raises:
+            Exception: The last error of the background thread since the previous call to flush or close
+        """
+        with self.lock:
+            self.condition.notify()
+
+        self.__raise_error()
+
+    def close(self) -> None:
+        """ Write all the pending updates and stop the background thread. The journal is removed once everything is written
+
+        Raises:
+            Exception: The last error of the background thread since the previous call to flush. The updates which
+            were not written are kept in the journal
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify()
+
+        self.thread.join()
+
+        self.journal.close()
+        if os.path.getsize(self.journal_path) == 0:
+            os.remove(self.journal_path)
+
+        self.__raise_error()
+
+    def __raise_error(self) -> None:
+        """ Raise the last error of the background thread, if any, only once
+        """
+        with self.lock:
+            error = self.error
+            self.error = None
+
+        if error is not None:
+            raise error
+
+    def __update(self, id: int, field: str, value) -> None:
+        """ Queue an update of a field of an entry, replacing any pending update of the same field
+
+        Args:
+            id (int): ID of the entry to update
+            field (str): Field of the entry state to update
+            value: New value of the field
+        """
+        with self.lock:
+            self.pending.setdefault(id, {})[field] = value
+
+            self.journal.write(json.dumps([id, field, value]) + "\n")
+            self.journal.flush()
+
+            if len(self.pending) >= self.max_pending:
+                self.condition.notify()
+
+    def __recover_journal(self) -> None:
+        """ Load the updates of the journal left by a previous queue into the pending updates
+        """
+        if not os.path.exists(self.journal_path):
+            return
+
+        with open(self.journal_path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    id, field, value = json.loads(line)
+                except ValueError:
+                    # the last line can be incomplete if the application stopped while writing it
+                    continue
+
+                if field in WriteBehindQueue.__UPDATE_METHODS:
+                    self.pending.setdefault(id, {})[field] = value
+
+    def __run(self) -> None:
+        """ Body of the background thread. Writes the pending updates until the queue is closed. If writing fails, the
+        updates are kept pending and written again after the next interval, except once the queue is closed
+        """
+        database = None
+        while True:
+            with self.lock:
+                if not self.closed and len(self.pending) < self.max_pending:
+                    self.condition.wait(self.flush_interval)
+
+                to_write = self.pending
+                self.pending = {}
+                closed = self.closed
+
+            try:
+                if len(to_write) != 0:
+                    # sqlite3 connections can only be used in the thread that created them
+                    if database is None:
+                        database = Connector.get_database(self.database)
+
+                    for id, fields in to_write.items():
+                        for field, value in fields.items():
+                            getattr(database, WriteBehindQueue.__UPDATE_METHODS[field])(id, value)
+                    database.save()
+
+                    self.__compact_journal()
+            except Exception as error:
+                __LOGGER__.exception("Could not write the pending updates to %s", self.database)
+                with self.lock:
+                    self.error = error
+                    # updates queued meanwhile are newer than the ones which were being written
+                    for id, fields in self.pending.items():
+                        to_write.setdefault(id, {}).update(fields)
+                    self.pending = to_write
+
+            if closed:
+                return
+
+    def __compact_journal(self) -> None:
+        """ Replace the journal with one with only the updates which are still pending. The new journal is fully written
+        to a temporary file before replacing the old one, so a crash at any moment leaves one of them complete
+        """
+        with self.lock:
+            temporary_path = self.journal_path + ".tmp"
+            with open(temporary_path, "w", encoding="utf-8") as temporary:
+                for id, fields in self.pending.items():
+                    for field, value in fields.items():
+                        temporary.write(json.dumps([id, field, value]) + "\n")
+                temporary.flush()
+                os.fsync(temporary.fileno())
+
+            # the old journal is closed first, as an open file cannot be replaced in every platform
+            self.journal.close()
+            try:
+                os.replace(temporary_path, self.journal_path)
+            finally:
+                self.journal = open(self.journal_path, "a", encoding="utf-8")
@@ -1,6 +1,7 @@
 import tkinter as tk
 from model.resource import ResourceData, ResourceFields
 from database.sqlite import Sqlite3
+from database.write_behind import WriteBehindQueue
 import webbrowser
 import re
 
@@ -73,6 +74,7 @@ class ApplicationGUI:
         self.root = tk.Tk()
         self.root.title("Filter Papers")
         self.root.bind("<Key>", self.__handle_keystroke)
+        self.root.protocol("WM_DELETE_WINDOW", self.__close)
         self.root.geometry(
             str(self.root.winfo_screenwidth())
             + "x"
@@ -95,6 +97,7 @@ class ApplicationGUI:
         self.old_state = None
 
         self.database = Sqlite3(args["database"])
+        self.updates = WriteBehindQueue(args["database"])
 
         reasons_to_show = args.get("show", [])
         rejected_to_show = []
@@ -106,7 +109,9 @@ class ApplicationGUI:
                 print(f"Warning: {reason} to show is not a valid rejected reason")
 
 
-        self.entries = self.database.get_entries(rejected_to_show)
+        self.entries = self.database.get_entry_sequence(
+            rejected_to_show, search=args.get("filter")
+        )
 
         if len(self.entries) != 0:
             self.current_pos = 0
@@ -141,39 +146,33 @@ class ApplicationGUI:
         if self.old_state is None:
             return
 
-        something_changed = False
+        # the database is updated in the background, so moving between entries never waits for it
         if self.old_state.save_for_later != self.later.get():
             # update database
-            self.database.update_save_for_later(
+            self.updates.update_save_for_later(
                 self.entries[self.current_pos][0], self.later.get()
             )
 
             # update cache
             self.entries[self.current_pos][1].state.save_for_later = self.later.get()
-            something_changed = True
 
         if self.old_state.rejected != self.rejected.get():
             # update database
-            self.database.update_rejected(
+            self.updates.update_rejected(
                 self.entries[self.current_pos][0], self.rejected.get()
             )
 
             # update cache
             self.entries[self.current_pos][1].state.rejected = self.rejected.get()
-            something_changed = True
 
         # tk adds a newline when inserting into a text for some reason
         current_notes = self.notes.get(1.0, tk.END)[:-1]
         if self.old_state.notes != current_notes:
             # update database
-            self.database.update_notes(self.entries[self.current_pos][0], current_notes)
+            self.updates.update_notes(self.entries[self.current_pos][0], current_notes)
 
             # update cache
             self.entries[self.current_pos][1].state.notes = current_notes
-            something_changed = True
-
-        if something_changed:
-            self.database.save()
 
     def go_to_previous(self):
         self.__check_and_update_state()
@@ -444,6 +443,11 @@ class ApplicationGUI:
 
     def launch(self):
         self.root.mainloop()
+        self.updates.close()
+
+    def __close(self):
+        self.__check_and_update_state()
+        self.root.destroy()
 
     def __open_link(self, url):
         webbrowser.open(url)
@@ -454,6 +458,8 @@ class ApplicationGUI:
 
     def __load_current(self):
         data = self.entries[self.current_pos][1]
+        # the entry could have been fetched again from the database before its updates were written
+        self.updates.apply_pending(self.entries[self.current_pos][0], data.state)
 
         self.counter.config(text=str(self.current_pos + 1))
 
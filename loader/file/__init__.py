@@ -0,0 +1,5 @@
+import loader.file.wos
+import loader.file.ieee_csv
+import loader.file.scopus_csv
+import loader.file.ris
+import loader.file.bibtex
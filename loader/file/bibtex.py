@@ -1,10 +1,18 @@
 from enum import StrEnum
-from pybtex.database import parse_file
+from typing import Iterable, Iterator
+from pybtex.database import BibliographyData
+from pybtex.database.input.bibtex import Parser
 
 from database.entry import Entry, EntrySource
+from loader.file.file_loader import FileLoader, get_origin, open_text
 from model.resource import ResourceData
 
-import os
+import itertools
+import re
+
+__ENTRY_START__ = re.compile(r"^\s*@\s*\w+\s*[{(]", re.MULTILINE)
+__ENTRY_OPENING__ = re.compile(r"@\s*(\w+)\s*([{(])")
+__ENTRY_SYNTAX__ = re.compile(r'[{}()"]')
 
 class Fields(StrEnum):
     """ Available fields in a bibtex entry
@@ -40,24 +48,211 @@ class Fields(StrEnum):
     VOLUME  = "volume"
     YEAR  = "year"
 
-def get_entries(source_file: str) -> list[Entry]:
-    """ Gets a list of entry objects from a bibtex file
+def get_entries(source_file: str) -> Iterator[Entry]:
+    """ Gets the entry objects from a bibtex file. The file is read and parsed one bibtex entry at a time, so the
+    memory used does not depend on the size of the file
+
+    Args:
+        source_file (str): Path to the bibtex file
+
+    Yields:
+        Iterator[Entry]: Entries, in the same order as in the file
+    """
+    with open_text(source_file) as file:
+        yield from parse_entries(split_entries(file), get_origin(source_file))
+
+
+def get_ranges(source_file: str, chunk_size: int) -> tuple[list[tuple[int, int]], str]:
+    """ Split a bibtex file into byte ranges which can be parsed independently. Ranges start at the beginning of a
+    bibtex entry, found as in split_entries, and are at least chunk_size bytes long, except the last one. As macros defined with @string can be
+    used by entries in any range, their definitions are returned too
 
     Args:
         source_file (str): Path to the bibtex file
+        chunk_size (int): Minimum size in bytes of each range
 
     Returns:
-        list[Entry]: List of entries
-    """
-    result = []
-    bibtex_data = parse_file(source_file)
-    source_file_no_ext = os.path.splitext(os.path.basename(source_file))[0]
-    for entry in bibtex_data.entries.values():
-        result.append(
-                Entry(
-                    ResourceData(entry.fields.get(Fields.DOI, ""), entry.fields.get(Fields.ISBN, ""), entry.fields.get(Fields.TITLE, ""), entry.fields.get(Fields.ABSTRACT, ""), entry.fields.get(Fields.KEYWORDS, "").replace(",", " |")),
-                    [EntrySource(source_file_no_ext, entry.fields.get(Fields.URL, ""))],
-                )
+        tuple[list[tuple[int, int]], str]: Start and end of each range and text of the macro definitions of the file
+    """
+    ranges = []
+    macros = []
+    start = 0
+    position = 0
+    in_macro = False
+    boundaries = EntryBoundaries()
+    with open(source_file, "rb") as file:
+        for line in file:
+            entry_type = boundaries.get_entry_start(line.decode("utf-8", errors="replace"))
+            if entry_type is not None:
+                if position - start >= chunk_size:
+                    ranges.append((start, position))
+                    start = position
+                in_macro = entry_type.lower() == "string"
+
+            if in_macro:
+                macros.append(line)
+
+            position += len(line)
+
+    if position > start:
+        ranges.append((start, position))
+
+    return (ranges, b"".join(macros).decode("utf-8-sig"))
+
+
+def get_entries_in_range(source_file: str, start: int, end: int, macros: str = "") -> Iterator[Entry]:
+    """ Gets the entry objects from a byte range of a bibtex file (see get_ranges)
+
+    Args:
+        source_file (str): Path to the bibtex file
+        start (int): Start of the range
+        end (int): End of the range
+        macros (str, optional): Macro definitions to be used by the entries of the range. Defaults to "".
+
+    Yields:
+        Iterator[Entry]: Entries, in the same order as in the file
+    """
+    with open(source_file, "rb") as file:
+        file.seek(start)
+        text = file.read(end - start).decode("utf-8-sig")
+
+    yield from parse_entries(split_entries(itertools.chain(macros.splitlines(True), text.splitlines(True))), get_origin(source_file))
+
+
+class EntryBoundaries:
+    """ Finds the lines where bibtex entries start. Braces and quoted strings are tracked, so a line of a field value
+    beginning with '@' (e.g. "@Override" in an abstract) is not taken as the start of an entry. Lines must be given
+    in order
+    """
+
+    def __init__(self) -> None:
+        """ Constructor. The first line is outside any entry
+        """
+        # depth of braces, 1 inside an entry and outside its values, and closing character of the current entry
+        self.depth = 0
+        self.quoted = False
+        self.closing = "}"
+
+    def get_entry_start(self, line: str) -> str | None:
+        """ Check if an entry starts in a line, updating the state with the whole line
+
+        Args:
+            line (str): Next line of the bibtex file
+
+        Returns:
+            str | None: Type of the entry starting at the beginning of the line (e.g. article or string), None if
+            no entry starts there
+        """
+        entry_type = None
+        if self.depth == 0 and __ENTRY_START__.match(line) is not None:
+            entry_type = __ENTRY_OPENING__.search(line).group(1)
+
+        position = 0
+        while True:
+            if self.depth == 0:
+                # outside entries only a new entry matters, anything else is a comment
+                opening = __ENTRY_OPENING__.search(line, position)
+                if opening is None:
+                    break
+
+                self.depth = 1
+                self.quoted = False
+                self.closing = ")" if opening.group(2) == "(" else "}"
+                position = opening.end()
+                continue
+
+            syntax = __ENTRY_SYNTAX__.search(line, position)
+            if syntax is None:
+                break
+
+            position = syntax.end()
+            character = syntax.group(0)
+            if character == "{":
+                self.depth += 1
+            elif character == "}" and (self.depth > 1 or self.closing == "}"):
+                self.depth -= 1
+            elif character == '"' and self.depth == 1:
+                self.quoted = not self.quoted
+            elif character == ")" and self.depth == 1 and self.closing == ")" and not self.quoted:
+                self.depth = 0
+
+        return entry_type
+
+
+def split_entries(lines: Iterable[str]) -> Iterator[str]:
+    """ Split the lines of a bibtex file into the text of each bibtex entry. An entry starts in a line beginning
+    with '@type{' or '@type(' outside any other entry (see EntryBoundaries). Any text before the first entry is
+    ignored, as bibtex does
+
+    Args:
+        lines (Iterable[str]): Lines of the bibtex file
+
+    Yields:
+        Iterator[str]: Text of each entry, including commands such as @string or @preamble
+    """
+    current = None
+    boundaries = EntryBoundaries()
+    for line in lines:
+        if boundaries.get_entry_start(line) is not None:
+            if current is not None:
+                yield "".join(current)
+            current = []
+
+        if current is not None:
+            current.append(line)
+
+    if current is not None:
+        yield "".join(current)
+
+
+def parse_entries(texts: Iterable[str], origin: str) -> Iterator[Entry]:
+    """ Parse the text of bibtex entries into entry objects. Macros defined with @string are kept for the
+    following entries
+
+    Args:
+        texts (Iterable[str]): Text of each bibtex entry
+        origin (str): Name given to the source of the entries
+
+    Yields:
+        Iterator[Entry]: Entries parsed
+    """
+    parser = Parser()
+    for text in texts:
+        # parsed entries are removed from the parser once returned, only the macros are kept
+        parser.data = BibliographyData()
+        for entry in parser.parse_string(text).entries.values():
+            yield Entry(
+                ResourceData(entry.fields.get(Fields.DOI, ""), entry.fields.get(Fields.ISBN, ""), entry.fields.get(Fields.TITLE, ""), entry.fields.get(Fields.ABSTRACT, ""), entry.fields.get(Fields.KEYWORDS, "")),
+                [EntrySource(origin, entry.fields.get(Fields.URL, ""))],
             )
 
-    return result
\ No newline at end of file
+
+class BibtexLoader(FileLoader):
+    """ Loader of bibtex files, as exported by most libraries (e.g. ACM, Scopus, IEEE)
+    """
+
+    NAME = "bibtex"
+
+    @staticmethod
+    def sniff(head: str) -> bool:
+        """ Check if a file is a bibtex file: a line starts a bibtex entry (e.g. "@article{")
+
+        Args:
+            head (str): First kilobytes of the file. The last line can be incomplete
+
+        Returns:
+            bool: True if the file is a bibtex file
+        """
+        return __ENTRY_START__.search(head) is not None
+
+    @staticmethod
+    def get_entries(source_file: str) -> Iterator[Entry]:
+        """ Gets the entry objects from a bibtex file (see get_entries)
+
+        Args:
+            source_file (str): Path to the file
+
+        Yields:
+            Iterator[Entry]: Entries, in the same order as in the file
+        """
+        return get_entries(source_file)
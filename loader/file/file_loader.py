@@ -0,0 +1,179 @@
+from enum import StrEnum
+from typing import Iterable, Iterator, Self, TextIO
+import codecs
+import os
+
+from database.entry import Entry
+
+__HEAD_SIZE__ = 4096
+
+
+class FileLoader:
+    """ Base class for the loaders of a file format. Each format inherits from this class, so it can be found by
+    its name or detected from the first kilobytes of a file
+    """
+
+    NAME = ""
+
+    @staticmethod
+    def sniff(head: str) -> bool:
+        """ Check if a file is in the format of the loader
+
+        Args:
+            head (str): First kilobytes of the file. The last line can be incomplete
+
+        Returns:
+            bool: True if the file is in the format of the loader
+        """
+        pass
+
+    @staticmethod
+    def get_entries(source_file: str) -> Iterator[Entry]:
+        """ Gets the entry objects from a file, reading it as the entries are consumed
+
+        Args:
+            source_file (str): Path to the file
+
+        Yields:
+            Iterator[Entry]: Entries, in the same order as in the file
+        """
+        pass
+
+    @staticmethod
+    def get_loader(name: str) -> type[Self] | None:
+        """ Searches the loader that inherits from FileLoader and matches the format name
+
+        Args:
+            name (str): Name of the format
+
+        Returns:
+            type[Self] | None: The loader of the format if it exists, None otherwise
+        """
+        return {loader.NAME: loader for loader in FileLoader.__subclasses__()}.get(name)
+
+    @staticmethod
+    def detect(source_file: str) -> type[Self]:
+        """ Detect the format of a file from its first kilobytes
+
+        Args:
+            source_file (str): Path to the file
+
+        Raises:
+            Exception: If no loader supports the file
+
+        Returns:
+            type[Self]: Loader of the file
+        """
+        with open_text(source_file) as file:
+            head = file.read(__HEAD_SIZE__)
+
+        for loader in FileLoader.__subclasses__():
+            if loader.sniff(head):
+                return loader
+
+        raise Exception(
+            "Unknown format of file " + source_file + ". Supported formats: "
+            + ", ".join(loader.NAME for loader in FileLoader.__subclasses__())
+        )
+
+
+def open_text(source_file: str) -> TextIO:
+    """ Open a text file for reading. Exports are encoded in utf-8, with or without a byte order mark, or in utf-16
+    with a byte order mark
+
+    Args:
+        source_file (str): Path to the file
+
+    Returns:
+        TextIO: Opened file
+    """
+    return open(source_file, encoding=get_encoding(source_file), errors="replace", newline="")
+
+
+def get_encoding(source_file: str) -> str:
+    """ Get the encoding of a text file from its byte order mark (see open_text)
+
+    Args:
+        source_file (str): Path to the file
+
+    Returns:
+        str: utf-16 if the file starts with a utf-16 byte order mark, utf-8-sig otherwise
+    """
+    with open(source_file, "rb") as file:
+        bom = file.read(2)
+
+    return "utf-16" if bom in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE) else "utf-8-sig"
+
+
+def get_origin(source_file: str) -> str:
+    """ Get the origin given to the entries of a file, which is its name without extension
+
+    Args:
+        source_file (str): Path to the file
+
+    Returns:
+        str: Origin of the entries
+    """
+    return os.path.splitext(os.path.basename(source_file))[0]
+
+
+def get_columns(header: list[str], known_headers: Iterable[StrEnum]) -> dict[StrEnum, int]:
+    """ Get the position of each known column from the header row of a delimited file. Headers are compared ignoring
+    case and spaces around them
+
+    Args:
+        header (list[str]): Header row of the file
+        known_headers (Iterable[StrEnum]): Headers to look for
+
+    Returns:
+        dict[StrEnum, int]: Position of each known column found in the header
+    """
+    known = {known.casefold(): known for known in known_headers}
+    columns = {}
+    for position, name in enumerate(header):
+        known_header = known.get(name.strip().casefold())
+        if known_header is not None:
+            columns.setdefault(known_header, position)
+
+    return columns
+
+
+def get_value(line: list[str], columns: dict[StrEnum, int], header: StrEnum) -> str:
+    """ Get the value of a column in a row of a delimited file
+
+    Args:
+        line (list[str]): Row of the file
+        columns (dict[StrEnum, int]): Position of each column (see get_columns)
+        header (StrEnum): Header of the column
+
+    Returns:
+        str: Value of the column, empty if the column is not in the file or the row is shorter
+    """
+    column = columns.get(header)
+    return line[column] if column is not None and column < len(line) else ""
+
+
+def get_header(head: str, delimiter: str) -> list[str]:
+    """ Get the header row of a delimited file from its first kilobytes
+
+    Args:
+        head (str): First kilobytes of the file
+        delimiter (str): Delimiter of the columns
+
+    Returns:
+        list[str]: Header row, stripped of spaces around each header
+    """
+    line = head.partition("\n")[0].rstrip("\r")
+    return [name.strip().strip('"').strip() for name in line.split(delimiter)]
+
+
+def join_keywords(keywords: Iterable[str]) -> str:
+    """ Join keywords with the separator used by ResourceData
+
+    Args:
+        keywords (Iterable[str]): Keywords to join
+
+    Returns:
+        str: Keywords separated by ' | '
+    """
+    return " | ".join(keyword.strip() for keyword in keywords if keyword.strip() != "")
@@ -1,61 +1,105 @@
-from enum import IntEnum
+from enum import StrEnum
+from typing import Iterator
 import csv
-import os
 
 from database.entry import Entry, EntrySource
+from loader.file.file_loader import FileLoader, get_columns, get_header, get_origin, get_value, open_text
 from model.resource import ResourceData
 
-class Headers(IntEnum):
-    """ Available columns/headers in the IEEE csv file
+class Headers(StrEnum):
+    """ Available columns/headers in the IEEE csv file. Columns are found by their header, as their order changes
+    between versions of the export
     """
-    DOCUMENT_TITLE = 0
-    AUTHORS = 1
-    AUTHOR_AFFILIATIONS = 2
-    PUBLICATION_TITLE = 3
-    DATE_ADDED_TO_XPLORE = 4
-    PUBLICATION_YEAR = 5
-    VOLUME = 6
-    ISSUE = 7
-    START_PAGE = 8
-    END_PAGE = 9
-    ABSTRACT = 10
-    ISSN = 11
-    ISBNS = 12
-    DOI = 13
-    FUNDING_INFORMATION = 14
-    PDF_LINK = 15
-    AUTHOR_KEYWORDS = 16
-    IEEE_TERMS = 17
-    MESH_TERMS = 18
-    ARTICLE_CITATION_COUNT = 19
-    PATENT_CITATION_COUNT = 20
-    REFERENCE_COUNT = 21
-    LICENSE = 22
-    ONLINE_DATE = 23
-    ISSUE_DATE = 24
-    MEETING_DATE = 25
-    PUBLISHER = 26
-    DOCUMENT_IDENTIFIER = 27
-
-def get_entries(source_file: str) -> list[Entry]:
-    """ Gets a list of entry objects from a ieee csv file
+    DOCUMENT_TITLE = "Document Title"
+    AUTHORS = "Authors"
+    AUTHOR_AFFILIATIONS = "Author Affiliations"
+    PUBLICATION_TITLE = "Publication Title"
+    DATE_ADDED_TO_XPLORE = "Date Added To Xplore"
+    PUBLICATION_YEAR = "Publication Year"
+    VOLUME = "Volume"
+    ISSUE = "Issue"
+    START_PAGE = "Start Page"
+    END_PAGE = "End Page"
+    ABSTRACT = "Abstract"
+    ISSN = "ISSN"
+    ISBNS = "ISBNs"
+    DOI = "DOI"
+    FUNDING_INFORMATION = "Funding Information"
+    PDF_LINK = "PDF Link"
+    AUTHOR_KEYWORDS = "Author Keywords"
+    IEEE_TERMS = "IEEE Terms"
+    MESH_TERMS = "Mesh_Terms"
+    ARTICLE_CITATION_COUNT = "Article Citation Count"
+    PATENT_CITATION_COUNT = "Patent Citation Count"
+    REFERENCE_COUNT = "Reference Count"
+    LICENSE = "License"
+    ONLINE_DATE = "Online Date"
+    ISSUE_DATE = "Issue Date"
+    MEETING_DATE = "Meeting Date"
+    PUBLISHER = "Publisher"
+    DOCUMENT_IDENTIFIER = "Document Identifier"
+
+def get_entries(source_file: str) -> Iterator[Entry]:
+    """ Gets the entry objects from a ieee csv file. The file is read one row at a time, so the memory used does not
+    depend on the size of the file
 
     Args:
         source_file (str): Path to the ieee csv file
 
-    Returns:
-        list[Entry]: List of entries
+    Raises:
+        Exception: If the file has no document title column
+
+    Yields:
+        Iterator[Entry]: Entries, in the same order as in the file
     """
-    result = []
-    with open(source_file) as file:
+    source_file_no_ext = get_origin(source_file)
+    with open_text(source_file) as file:
         csv_input = csv.reader(file, delimiter=',', quoting=csv.QUOTE_ALL)
-        source_file_no_ext = os.path.splitext(os.path.basename(source_file))[0]
+
+        header = next(csv_input, None)
+        if header is None:
+            return
+
+        columns = get_columns(header, Headers)
+        if Headers.DOCUMENT_TITLE not in columns:
+            raise Exception("No \"" + Headers.DOCUMENT_TITLE + "\" column in the IEEE csv file " + source_file)
+
         for line in csv_input:
-            result.append(
-                    Entry(
-                        ResourceData(line[Headers.DOI], line[Headers.ISBNS], line[Headers.DOCUMENT_TITLE], line[Headers.ABSTRACT], line[Headers.AUTHOR_KEYWORDS].replace(";", " | ")),
-                        [EntrySource(source_file_no_ext, line[Headers.PDF_LINK])],
-                    )
-                )
-
-    return result[1:]
\ No newline at end of file
+            if len(line) == 0:
+                continue
+
+            yield Entry(
+                ResourceData(get_value(line, columns, Headers.DOI), get_value(line, columns, Headers.ISBNS), get_value(line, columns, Headers.DOCUMENT_TITLE), get_value(line, columns, Headers.ABSTRACT), get_value(line, columns, Headers.AUTHOR_KEYWORDS)),
+                [EntrySource(source_file_no_ext, get_value(line, columns, Headers.PDF_LINK))],
+            )
+
+
+class IEEECsvLoader(FileLoader):
+    """ Loader of IEEE Xplore csv exports
+    """
+
+    NAME = "ieee-csv"
+
+    @staticmethod
+    def sniff(head: str) -> bool:
+        """ Check if a file is an IEEE Xplore csv export: the header has the document title
+
+        Args:
+            head (str): First kilobytes of the file. The last line can be incomplete
+
+        Returns:
+            bool: True if the file is an IEEE Xplore csv export
+        """
+        return Headers.DOCUMENT_TITLE in get_header(head, ",")
+
+    @staticmethod
+    def get_entries(source_file: str) -> Iterator[Entry]:
+        """ Gets the entry objects from an IEEE Xplore csv export (see get_entries)
+
+        Args:
+            source_file (str): Path to the file
+
+        Yields:
+            Iterator[Entry]: Entries, in the same order as in the file
+        """
+        return get_entries(source_file)
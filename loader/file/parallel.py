@@ -0,0 +1,112 @@
+""" Parsing of bibtex files in a pool of processes. Files are divided into tasks (byte ranges starting at a bibtex
+entry) which are parsed in parallel, while the parsed entries are returned in the same order as if the files were
+parsed one after the other. Only bibtex files can be split, so files in other formats are not parsed in the pool:
+as a whole, all their entries would be in memory at once, so they are better streamed by the caller (see can_split)
+"""
+
+import collections
+import multiprocessing
+from typing import Iterator
+
+from database import dedup
+from database.entry import Entry
+from loader.file import bibtex
+from loader.file.file_loader import FileLoader, get_encoding
+from model.normalization import normalize_resource
+
+__CHUNK_SIZE__ = 8 * 1024 * 1024
+
+
+class ParseTask:
+    """ Part of a file to be parsed by a process of the pool
+    """
+
+    def __init__(self, file: str, start: int, end: int, macros: str = "") -> None:
+        """ Constructor
+
+        Args:
+            file (str): Path to the bibtex file
+            start (int): Start of the byte range to parse
+            end (int): End of the byte range to parse
+            macros (str, optional): Bibtex macro definitions used by the range. Defaults to "".
+        """
+        self.file = file
+        self.start = start
+        self.end = end
+        self.macros = macros
+
+
+def can_split(file_loader: type[FileLoader], file: str) -> bool:
+    """ Check if a file can be split into parse tasks. Only bibtex files can, as in other formats a field can contain
+    line breaks, and only in utf-8, as the ranges are found in utf-8 bytes
+
+    Args:
+        file_loader (type[FileLoader]): Loader of the file
+        file (str): Path to the file
+
+    Returns:
+        bool: True if the file can be split
+    """
+    return file_loader is bibtex.BibtexLoader and get_encoding(file) != "utf-16"
+
+
+def get_tasks(files: list[tuple[type[FileLoader], str]], chunk_size: int = __CHUNK_SIZE__) -> list[ParseTask]:
+    """ Divide files into parse tasks, ranges of about chunk_size bytes at the start of bibtex entries. Files which
+    cannot be split (see can_split) are left out
+
+    Args:
+        files (list[tuple[type[FileLoader], str]]): Loader and path of each file
+        chunk_size (int, optional): Minimum size in bytes of the ranges. Defaults to 8 MiB.
+
+    Returns:
+        list[ParseTask]: Tasks, in the order the files are given
+    """
+    tasks = []
+    for file_loader, file in files:
+        if can_split(file_loader, file):
+            ranges, macros = bibtex.get_ranges(file, chunk_size)
+            tasks.extend(ParseTask(file, start, end, macros) for start, end in ranges)
+
+    return tasks
+
+
+def parse_task(task: ParseTask) -> list[Entry]:
+    """ Parse a task. Runs in a process of the pool. The entries are also normalized and their deduplication keys
+    cached, so that work is done in parallel too
+
+    Args:
+        task (ParseTask): Task to parse
+
+    Returns:
+        list[Entry]: Entries of the task
+    """
+    entries = list(bibtex.get_entries_in_range(task.file, task.start, task.end, task.macros))
+    for entry in entries:
+        normalize_resource(entry.resource)
+        dedup.get_keys(entry.resource)
+
+    return entries
+
+
+def get_entries(tasks: list[ParseTask], jobs: int) -> Iterator[tuple[ParseTask, list[Entry]]]:
+    """ Parse tasks in a pool of processes. Only a few tasks are parsed ahead of the one being returned, so the
+    entries waiting to be consumed are bounded
+
+    Args:
+        tasks (list[ParseTask]): Tasks to parse
+        jobs (int): Number of processes of the pool
+
+    Yields:
+        Iterator[tuple[ParseTask, list[Entry]]]: Each task and its entries, in the same order as the tasks
+    """
+    with multiprocessing.Pool(jobs) as pool:
+        pending = collections.deque()
+        for task in tasks:
+            pending.append((task, pool.apply_async(parse_task, (task,))))
+            if len(pending) >= 2 * jobs:
+                task, result = pending.popleft()
+                yield (task, result.get())
+
+        while len(pending) != 0:
+            task, result = pending.popleft()
+            yield (task, result.get())
@@ -0,0 +1,159 @@
+from enum import StrEnum
+from typing import Iterator
+import re
+
+from database.entry import Entry, EntrySource
+from loader.file.file_loader import FileLoader, get_origin, join_keywords, open_text
+from model.resource import ResourceData
+
+__TAG_LINE__ = re.compile(r"^([A-Z][A-Z0-9])  -(?: (.*))?$")
+__FIRST_TAG__ = re.compile(r"^TY  - ", re.MULTILINE)
+# an ISSN has 8 characters, while an ISBN has 10 or 13
+__ISBN__ = re.compile(r"^(?:\d{9}[\dX]|\d{13})$")
+
+
+class Tags(StrEnum):
+    """ Used tags of a RIS record
+    """
+
+    TYPE = "TY"
+    TITLE = "TI"
+    PRIMARY_TITLE = "T1"
+    ABSTRACT = "AB"
+    NOTES_ABSTRACT = "N2"
+    KEYWORD = "KW"
+    DOI = "DO"
+    SERIAL_NUMBER = "SN"
+    URL = "UR"
+    END = "ER"
+
+
+def get_entries(source_file: str) -> Iterator[Entry]:
+    """ Gets the entry objects from a RIS file. The file is read one record at a time, so the memory used does not
+    depend on the size of the file
+
+    Args:
+        source_file (str): Path to the RIS file
+
+    Yields:
+        Iterator[Entry]: Entries, in the same order as in the file
+    """
+    source_file_no_ext = get_origin(source_file)
+    with open_text(source_file) as file:
+        for record in get_records(file):
+            yield Entry(
+                ResourceData(
+                    get_first(record, Tags.DOI),
+                    get_isbn(record),
+                    get_first(record, Tags.TITLE, Tags.PRIMARY_TITLE),
+                    get_first(record, Tags.ABSTRACT, Tags.NOTES_ABSTRACT),
+                    join_keywords(record.get(Tags.KEYWORD, [])),
+                ),
+                [EntrySource(source_file_no_ext, get_first(record, Tags.URL))],
+            )
+
+
+def get_records(lines: Iterator[str]) -> Iterator[dict[str, list[str]]]:
+    """ Split the lines of a RIS file into records. A record starts with the TY tag and finishes with the ER tag.
+    Lines without a tag continue the value of the previous tag
+
+    Args:
+        lines (Iterator[str]): Lines of the RIS file
+
+    Yields:
+        Iterator[dict[str, list[str]]]: Values of each tag of a record, in the order they appear
+    """
+    record = None
+    last_values = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        match = __TAG_LINE__.match(line)
+
+        if match is None:
+            if last_values is not None and line.strip() != "":
+                last_values[-1] += " " + line.strip()
+            continue
+
+        tag, value = match.group(1), (match.group(2) or "").strip()
+        if tag == Tags.TYPE:
+            record = {}
+        elif record is None:
+            continue
+
+        if tag == Tags.END:
+            yield record
+            record = None
+            last_values = None
+            continue
+
+        last_values = record.setdefault(tag, [])
+        last_values.append(value)
+
+    # a file can miss the end tag of the last record
+    if record is not None:
+        yield record
+
+
+def get_first(record: dict[str, list[str]], *tags: Tags) -> str:
+    """ Get the first value of the first tag present in a record
+
+    Args:
+        record (dict[str, list[str]]): Record
+        tags (Tags): Tags to look for, by order of preference
+
+    Returns:
+        str: Value of the tag, empty if none of the tags is present
+    """
+    for tag in tags:
+        for value in record.get(tag, []):
+            if value != "":
+                return value
+
+    return ""
+
+
+def get_isbn(record: dict[str, list[str]]) -> str:
+    """ Get the ISBN of a record. The SN tag contains either an ISSN or an ISBN, depending on the type of record
+
+    Args:
+        record (dict[str, list[str]]): Record
+
+    Returns:
+        str: ISBN, empty if the record has none
+    """
+    for value in record.get(Tags.SERIAL_NUMBER, []):
+        if __ISBN__.match(value.replace("-", "").replace(" ", "").upper()):
+            return value
+
+    return ""
+
+
+class RISLoader(FileLoader):
+    """ Loader of RIS files (Research Information Systems), as exported by most libraries and reference managers
+    """
+
+    NAME = "ris"
+
+    @staticmethod
+    def sniff(head: str) -> bool:
+        """ Check if a file is a RIS file: a line starts with the tag of the record type ("TY  - ")
+
+        Args:
+            head (str): First kilobytes of the file. The last line can be incomplete
+
+        Returns:
+            bool: True if the file is a RIS file
+        """
+        return __FIRST_TAG__.search(head) is not None
+
+    @staticmethod
+    def get_entries(source_file: str) -> Iterator[Entry]:
+        """ Gets the entry objects from a RIS file (see get_entries)
+
+        Args:
+            source_file (str): Path to the file
+
+        Yields:
+            Iterator[Entry]: Entries, in the same order as in the file
+        """
+        return get_entries(source_file)
@@ -0,0 +1,99 @@
+from enum import StrEnum
+from typing import Iterator
+import csv
+
+from database.entry import Entry, EntrySource
+from loader.file.file_loader import FileLoader, get_columns, get_header, get_origin, get_value, open_text
+from model.resource import ResourceData
+
+# value given by scopus to the abstract of resources without one
+__NO_ABSTRACT__ = "[No abstract available]"
+
+
+class Headers(StrEnum):
+    """ Used columns/headers in the Scopus csv file. Columns are found by their header, as the columns exported
+    can be chosen
+    """
+
+    TITLE = "Title"
+    SOURCE_TITLE = "Source title"
+    DOI = "DOI"
+    LINK = "Link"
+    ABSTRACT = "Abstract"
+    AUTHOR_KEYWORDS = "Author Keywords"
+    ISBN = "ISBN"
+    EID = "EID"
+
+
+def get_entries(source_file: str) -> Iterator[Entry]:
+    """ Gets the entry objects from a Scopus csv file. The file is read one row at a time, so the memory used does
+    not depend on the size of the file
+
+    Args:
+        source_file (str): Path to the Scopus csv file
+
+    Raises:
+        Exception: If the file has no title column
+
+    Yields:
+        Iterator[Entry]: Entries, in the same order as in the file
+    """
+    source_file_no_ext = get_origin(source_file)
+    with open_text(source_file) as file:
+        csv_input = csv.reader(file, delimiter=",")
+
+        header = next(csv_input, None)
+        if header is None:
+            return
+
+        columns = get_columns(header, Headers)
+        if Headers.TITLE not in columns:
+            raise Exception("No \"" + Headers.TITLE + "\" column in the Scopus csv file " + source_file)
+
+        for line in csv_input:
+            if len(line) == 0:
+                continue
+
+            abstract = get_value(line, columns, Headers.ABSTRACT)
+            yield Entry(
+                ResourceData(
+                    get_value(line, columns, Headers.DOI),
+                    get_value(line, columns, Headers.ISBN),
+                    get_value(line, columns, Headers.TITLE),
+                    abstract if abstract != __NO_ABSTRACT__ else "",
+                    get_value(line, columns, Headers.AUTHOR_KEYWORDS),
+                ),
+                [EntrySource(source_file_no_ext, get_value(line, columns, Headers.LINK))],
+            )
+
+
+class ScopusCsvLoader(FileLoader):
+    """ Loader of Scopus csv exports
+    """
+
+    NAME = "scopus-csv"
+
+    @staticmethod
+    def sniff(head: str) -> bool:
+        """ Check if a file is a Scopus csv export: the header has the title and the EID or source title
+
+        Args:
+            head (str): First kilobytes of the file. The last line can be incomplete
+
+        Returns:
+            bool: True if the file is a Scopus csv export
+        """
+        header = get_header(head, ",")
+        return Headers.TITLE in header and (Headers.EID in header or Headers.SOURCE_TITLE in header)
+
+    @staticmethod
+    def get_entries(source_file: str) -> Iterator[Entry]:
+        """ Gets the entry objects from a Scopus csv export (see get_entries)
+
+        Args:
+            source_file (str): Path to the file
+
+        Yields:
+            Iterator[Entry]: Entries, in the same order as in the file
+        """
+        return get_entries(source_file)
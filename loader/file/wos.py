@@ -0,0 +1,97 @@
+from enum import StrEnum
+from typing import Iterator
+import csv
+
+from database.entry import Entry, EntrySource
+from loader.file.file_loader import FileLoader, get_columns, get_header, get_origin, get_value, open_text
+from model.resource import ResourceData
+
+__RECORD_URL__ = "https://www.webofscience.com/wos/woscc/full-record/"
+
+
+class Tags(StrEnum):
+    """ Used columns/tags in the Web of Science tab-delimited file
+    """
+
+    PUBLICATION_TYPE = "PT"
+    TITLE = "TI"
+    ABSTRACT = "AB"
+    AUTHOR_KEYWORDS = "DE"
+    DOI = "DI"
+    ISBN = "BN"
+    ACCESSION_NUMBER = "UT"
+
+
+def get_entries(source_file: str) -> Iterator[Entry]:
+    """ Gets the entry objects from a Web of Science tab-delimited file. The file is read one row at a time, so the
+    memory used does not depend on the size of the file
+
+    Args:
+        source_file (str): Path to the Web of Science file
+
+    Raises:
+        Exception: If the file has no title column
+
+    Yields:
+        Iterator[Entry]: Entries, in the same order as in the file
+    """
+    source_file_no_ext = get_origin(source_file)
+    with open_text(source_file) as file:
+        # values are never quoted, and can contain quotes
+        tsv_input = csv.reader(file, delimiter="\t", quoting=csv.QUOTE_NONE)
+
+        header = next(tsv_input, None)
+        if header is None:
+            return
+
+        columns = get_columns(header, Tags)
+        if Tags.TITLE not in columns:
+            raise Exception("No \"" + Tags.TITLE + "\" column in the Web of Science file " + source_file)
+
+        for line in tsv_input:
+            if len(line) == 0 or "".join(line).strip() == "":
+                continue
+
+            accession_number = get_value(line, columns, Tags.ACCESSION_NUMBER)
+            yield Entry(
+                ResourceData(
+                    get_value(line, columns, Tags.DOI),
+                    get_value(line, columns, Tags.ISBN),
+                    get_value(line, columns, Tags.TITLE),
+                    get_value(line, columns, Tags.ABSTRACT),
+                    get_value(line, columns, Tags.AUTHOR_KEYWORDS),
+                ),
+                [EntrySource(source_file_no_ext, __RECORD_URL__ + accession_number if accession_number != "" else "")],
+            )
+
+
+class WoSLoader(FileLoader):
+    """ Loader of Web of Science tab-delimited exports
+    """
+
+    NAME = "wos"
+
+    @staticmethod
+    def sniff(head: str) -> bool:
+        """ Check if a file is a Web of Science tab-delimited export: the header starts with the publication type and has the title
+
+        Args:
+            head (str): First kilobytes of the file. The last line can be incomplete
+
+        Returns:
+            bool: True if the file is a Web of Science tab-delimited export
+        """
+        header = get_header(head, "\t")
+        return header[0] == Tags.PUBLICATION_TYPE and Tags.TITLE in header
+
+    @staticmethod
+    def get_entries(source_file: str) -> Iterator[Entry]:
+        """ Gets the entry objects from a Web of Science tab-delimited export (see get_entries)
+
+        Args:
+            source_file (str): Path to the file
+
+        Yields:
+            Iterator[Entry]: Entries, in the same order as in the file
+        """
+        return get_entries(source_file)
@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.parse
+
+from loader.remote.parameters import Parameters
+
+
+class ResponseCache:
+    """ Cache of the responses of remote sources in disk, so a search can be repeated (e.g. after a failure or to
+    reproduce it) without requesting the pages again. Each response is stored as a gzip compressed JSON file named by
+    the hash of the provider, the URL and the parameters of the request (keys and tokens excluded), which include the
+    query and the page offset or cursor. It is configured with the cache section of the configuration:
+      - directory: where the responses are stored
+      - ttl: seconds a response is valid (one day by default, null for forever)
+      - max_size: maximum bytes of all the responses, the oldest ones are removed when exceeded (no limit by default)
+    The responses read from the cache are counted per provider, so the caller can tell that the results are not fresh
+    (see pop_hits).
+    """
+
+    __CACHES = {}
+    __LOCK = threading.Lock()
+    # parameters which are not part of the request, only authenticate it
+    __SECRET_PARAMETERS__ = {"apikey", "api_key", "apiKey", "insttoken"}
+    __DEFAULT_TTL__ = 24 * 60 * 60
+
+    def __init__(self, parameters: dict) -> None:
+        self.parameters = parameters
+        self.directory = parameters["directory"]
+        self.ttl = parameters.get("ttl", ResponseCache.__DEFAULT_TTL__)
+        self.max_size = parameters.get("max_size", None)
+        self.lock = threading.Lock()
+        # responses read from the cache and time the oldest of them was stored, by provider
+        self.hits = {}
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.files = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".json.gz"):
+                stat = entry.stat()
+                self.files[entry.path] = (stat.st_mtime, stat.st_size)
+        self.size = sum(size for _, size in self.files.values())
+
+    @staticmethod
+    def get_cache() -> "ResponseCache | None":
+        parameters = Parameters.GLOBAL_PARAMETERS.get("cache")
+        if parameters is None:
+            return None
+
+        with ResponseCache.__LOCK:
+            cache = ResponseCache.__CACHES.get(parameters["directory"])
+            # a new cache is created if the parameters were initialized again
+            if cache is None or cache.parameters is not parameters:
+                cache = ResponseCache(parameters)
+                ResponseCache.__CACHES[parameters["directory"]] = cache
+
+        return cache
+
+    def get(self, provider: str, url: str, params: dict = None) -> dict | None:
+        path = self.__get_path(provider, url, params)
+        try:
+            stored = os.path.getmtime(path)
+            if self.ttl is not None and time.time() - stored > self.ttl:
+                return None
+
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                response = json.load(file)
+        except (OSError, ValueError):
+            # missing, removed while reading or corrupted
+            return None
+
+        with self.lock:
+            count, oldest = self.hits.get(provider, (0, stored))
+            self.hits[provider] = (count + 1, min(oldest, stored))
+
+        return response
+
+    def pop_hits(self, provider: str) -> tuple[int, float | None]:
+        """ Get the responses of a provider read from the cache since the last call, and reset them
+
+        Args:
+            provider (str): Name of the provider
+
+        Returns:
+            tuple[int, float | None]: Number of responses and time the oldest of them was stored, None if there are none
+        """
+        with self.lock:
+            return self.hits.pop(provider, (0, None))
+
+    def put(self, provider: str, url: str, params: dict, response: dict) -> None:
+        path = self.__get_path(provider, url, params)
+        data = gzip.compress(json.dumps(response).encode("utf-8"))
+
+        # written to a temporary file first, so other processes never read a partial response
+        temporary = path + "." + str(os.getpid()) + "." + str(threading.get_ident()) + ".tmp"
+        with open(temporary, "wb") as file:
+            file.write(data)
+        os.replace(temporary, path)
+
+        with self.lock:
+            if path in self.files:
+                self.size -= self.files[path][1]
+            self.files[path] = (time.time(), len(data))
+            self.size += len(data)
+            self.__evict()
+
+    def __evict(self) -> None:
+        if self.max_size is None or self.size <= self.max_size:
+            return
+
+        for path, (_, size) in sorted(self.files.items(), key=lambda item: item[1][0]):
+            if self.size <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            del self.files[path]
+            self.size -= size
+
+    def __get_path(self, provider: str, url: str, params: dict = None) -> str:
+        # parameters given in the URL (e.g. the next page link) and apart are merged and sorted, and white spaces in
+        # the values collapsed, so the same request always has the same key
+        parsed = urllib.parse.urlsplit(url)
+        request_params = urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)
+        request_params += [(key, str(value)) for key, value in (params or {}).items() if value is not None]
+        request_params = sorted(
+            (key, " ".join(value.split()))
+            for key, value in request_params
+            if key not in ResponseCache.__SECRET_PARAMETERS__
+        )
+
+        key = json.dumps([provider, parsed.scheme, parsed.netloc, parsed.path, request_params])
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json.gz")
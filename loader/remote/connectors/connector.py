@@ -1,3 +1,5 @@
+from typing import Iterator
+
 from database.entry import Entry
 
 
@@ -5,18 +7,30 @@ class Connector:
     def __init__(self, query: str) -> None:
         pass
 
-    def request_all(self) -> list[Entry]:
-        to_return = self.request_first()
-        while True:
-            prev_len = len(to_return)
-            to_return.extend(self.request_next())
-            if len(to_return) == prev_len:
-                break
+    def request_pages(self, checkpoint: dict | None = None) -> Iterator[list[Entry]]:
+        # each page is returned as soon as it arrives, so it can be stored before requesting the next one. After
+        # each page, get_checkpoint returns the state to continue from the next one
+        if checkpoint is None:
+            page = self.request_first()
+        else:
+            self.set_checkpoint(checkpoint)
+            page = self.request_next()
 
-        return to_return
+        while len(page) != 0:
+            yield page
+            page = self.request_next()
 
     def request_first(self) -> list[Entry]:
         pass
 
     def request_next(self) -> list[Entry]:
         pass
+
+    def request_total(self) -> int:
+        pass
+
+    def get_checkpoint(self) -> dict:
+        pass
+
+    def set_checkpoint(self, checkpoint: dict) -> None:
+        pass
@@ -1,16 +1,19 @@
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+import collections
 
 from database.entry import Entry, EntrySource
 from loader.remote.connectors.connector import Connector
+from loader.remote.connectors.transport import Transport
 from model.resource import ResourceData, ResourceFields
-from loader.remote.parameters import Parameters
+from loader.remote.parameters import Parameters as RemoteParameters
 
 
-class Parameters(Parameters):
+class Parameters(RemoteParameters):
     NAME = "ieee"
 
     def get_parameters() -> dict:
-        parameters = Parameters.get_parameters(Parameters.NAME)
+        parameters = RemoteParameters.get_parameters(Parameters.NAME)
         if "token" not in parameters:
             raise Exception("Missing token to connect to the IEEE API")
 
@@ -19,6 +22,8 @@ class Parameters(Parameters):
 
 class IEEEConnector(Connector):
     __API_URI__ = "https://ieeexploreapi.ieee.org/api/v1/search/articles"
+    # maximum number of records per page allowed by the API
+    __MAX_RECORDS__ = 200
     __FIELDS_MAP = {
         ResourceFields.DOI: "doi",
         ResourceFields.ISBN: "isbn",
@@ -31,34 +36,126 @@ class IEEEConnector(Connector):
     def __init__(self, query: str) -> None:
         ieee_parameters = Parameters.get_parameters()
         self.token = ieee_parameters["token"]
+        # the URI can be changed, e.g. to a local server for testing
+        self.uri = ieee_parameters.get("uri", IEEEConnector.__API_URI__)
+        self.max_records = ieee_parameters.get("max_records", IEEEConnector.__MAX_RECORDS__)
+        # limits of a search, to split the query (see query.planner)
+        self.max_query_length = ieee_parameters.get("max_query_length", None)
+        self.max_results = ieee_parameters.get("max_results", None)
+        # pages requested at the same time
+        self.concurrency = ieee_parameters.get("concurrency", 1)
+        self.transport = Transport.get_transport(Parameters.NAME)
         self.query = query
         self.start_record = 1
+        self.total_records = None
+        # records received by the concurrent paging, to warn if they are not the reported total
+        self.received = 0
+
+    def request_pages(self, checkpoint: dict | None = None) -> Iterator[list[Entry]]:
+        if self.concurrency <= 1:
+            yield from super().request_pages(checkpoint)
+            return
+
+        if checkpoint is not None:
+            self.set_checkpoint(checkpoint)
+
+        first_record = self.start_record
+        self.received = 0
+        if self.total_records is None:
+            page = self.request_next()
+            if len(page) == 0:
+                return
+            self.received += len(page)
+            yield page
+
+            if self.total_records is None:
+                yield from super().request_pages(self.get_checkpoint())
+                return
+
+        # paging is by offset, so once the total is known the next pages can be requested at the same time. Only a
+        # few pages are requested ahead of the one being returned, so the pages waiting to be stored are bounded
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending = collections.deque()
+            for start_record in range(self.start_record, self.total_records + 1, self.max_records):
+                pending.append((start_record, executor.submit(self.__request_page, start_record)))
+                if len(pending) >= 2 * self.concurrency:
+                    yield from self.__next_pages(pending, 1)
+
+            yield from self.__next_pages(pending, len(pending))
+
+        expected = self.total_records - first_record + 1
+        if self.received != expected:
+            print(
+                "Warning: IEEE returned " + str(self.received) + " records instead of the " + str(expected)
+                + " reported for the query " + self.query
+            )
+
+    def __next_pages(self, pending: collections.deque, count: int) -> Iterator[list[Entry]]:
+        # pages are returned in order, as when requested one after the other
+        for _ in range(count):
+            start_record, future = pending.popleft()
+            page = future.result()
+
+            # the offset of the next page was fixed before this one arrived, so the records missing in a short page
+            # are requested again not to skip them
+            page_size = min(self.max_records, self.total_records - start_record + 1)
+            while len(page) < page_size:
+                missing = self.__request_page(start_record + len(page))[: page_size - len(page)]
+                if len(missing) == 0:
+                    break
+                page = page + missing
+
+            self.start_record = start_record + len(page)
+            self.received += len(page)
+            if len(page) != 0:
+                yield page
 
     def request_first(self) -> list[Entry]:
         return self.request_next()
 
     def request_next(self) -> list[Entry]:
-        response = self.__make_api_call()
-        return self.__parse_response(response)
+        entries = self.__request_page(self.start_record)
+        self.start_record = self.start_record + len(entries)
+        return entries
 
-    def __make_api_call(self) -> str:
+    def request_total(self) -> int:
         parameters = dict(
             apikey=self.token,
             querytext=self.query,
-            start_record=self.start_record
-        )
-        response = requests.get(
-            url=IEEEConnector.__API_URI__, params=parameters,
+            start_record=1,
+            max_records=1,
         )
+        response = self.transport.get_json(url=self.uri, params=parameters)
+        return response.get("total_records", 0)
 
-        if not response.ok:
-            return response.raise_for_status()
+    def get_checkpoint(self) -> dict:
+        return dict(start_record=self.start_record, total_records=self.total_records)
 
-        return response.json()
+    def set_checkpoint(self, checkpoint: dict) -> None:
+        self.start_record = checkpoint["start_record"]
+        self.total_records = checkpoint.get("total_records")
+
+    def __request_page(self, start_record: int) -> list[Entry]:
+        response = self.__make_api_call(start_record)
+        return self.__parse_response(response)
+
+    def __make_api_call(self, start_record: int) -> str:
+        parameters = dict(
+            apikey=self.token,
+            querytext=self.query,
+            start_record=start_record,
+            max_records=self.max_records,
+        )
+        return self.transport.get_json(
+            url=self.uri, params=parameters,
+        )
 
     def __parse_response(self, response: dict) -> list[Entry]:
+        if "total_records" in response:
+            self.total_records = response["total_records"]
+
         to_return = []
-        for entry in response["articles"]:
+        for entry in response.get("articles", []):
             doi = entry.get(IEEEConnector.__FIELDS_MAP[ResourceFields.DOI], "")
             isbn = entry.get(IEEEConnector.__FIELDS_MAP[ResourceFields.ISBN], "")
             title = entry.get(IEEEConnector.__FIELDS_MAP[ResourceFields.TITLE], "")
@@ -80,7 +177,6 @@ class IEEEConnector(Connector):
                     [EntrySource(Parameters.NAME, link)],
                 )
             )
-        self.start_record = self.start_record + len(response["articles"])
         return to_return
 
    
\ No newline at end of file
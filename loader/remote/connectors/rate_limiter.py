@@ -0,0 +1,31 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """ Token bucket limiting the requests started per second. Up to burst requests can be started at once, and the
+    bucket is refilled at rate tokens per second. It can be shared by several threads
+    """
+
+    def __init__(self, rate: float | None, burst: int = 1) -> None:
+        # no limit if the rate is not given
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.rate:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # a negative number of tokens reserves the next ones, so waiting threads are served in order
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if delay > 0:
+            time.sleep(delay)
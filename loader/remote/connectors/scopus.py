@@ -1,16 +1,15 @@
-import requests
-
 from database.entry import Entry, EntrySource
 from loader.remote.connectors.connector import Connector
+from loader.remote.connectors.transport import Transport
 from model.resource import ResourceData, ResourceFields
-from loader.remote.parameters import Parameters
+from loader.remote.parameters import Parameters as RemoteParameters
 
 
-class Parameters(Parameters):
+class Parameters(RemoteParameters):
     NAME = "scopus"
 
     def get_parameters() -> dict:
-        parameters = Parameters.get_parameters(Parameters.NAME)
+        parameters = RemoteParameters.get_parameters(Parameters.NAME)
         if "token" not in parameters:
             raise Exception("Missing token to connect to the Scopus API")
 
@@ -33,6 +32,12 @@ class ScopusConnector(Connector):
         self.token = scopus_parameters["token"]
         self.institutional_token = scopus_parameters.get("institutional_token", None)
         self.partner_id = scopus_parameters.get("partner_id", None)
+        # the URI can be changed, e.g. to a local server for testing
+        self.uri = scopus_parameters.get("uri", ScopusConnector.__API_URI__)
+        # limits of a search, to split the query (see query.planner)
+        self.max_query_length = scopus_parameters.get("max_query_length", None)
+        self.max_results = scopus_parameters.get("max_results", None)
+        self.transport = Transport.get_transport(Parameters.NAME)
         self.query = query
         self.next_link = None
 
@@ -44,6 +49,24 @@ class ScopusConnector(Connector):
         response = self.__make_api_call(False)
         return self.__parse_response(response)
 
+    def request_total(self) -> int:
+        headers = {
+            "X-ELS-APIKey": self.token,
+            "X-ELS-Insttoken": self.institutional_token,
+        }
+        parameters = dict(
+            query=self.query,
+            count=1,
+        )
+        response = self.transport.get_json(url=self.uri, params=parameters, headers=headers)
+        return int(response.get("search-results", {}).get("opensearch:totalResults", 0))
+
+    def get_checkpoint(self) -> dict:
+        return dict(next_link=self.next_link)
+
+    def set_checkpoint(self, checkpoint: dict) -> None:
+        self.next_link = checkpoint["next_link"]
+
     def __make_api_call(self, first: bool) -> str:
         headers = {
             "X-ELS-APIKey": self.token,
@@ -62,24 +85,14 @@ class ScopusConnector(Connector):
             view="COMPLETE",
             cursor="*",
         )
-        response = requests.get(
-            url=ScopusConnector.__API_URI__, params=parameters, headers=headers
+        return self.transport.get_json(
+            url=self.uri, params=parameters, headers=headers
         )
 
-        if not response.ok:
-            return response.raise_for_status()
-
-        return response.json()
-
     def __make_next_api_call(self, headers: dict) -> str:
         if self.next_link is None:
             return {}
-        response = requests.get(url=self.next_link, headers=headers)
-
-        if not response.ok:
-            return response.raise_for_status()
-
-        return response.json()
+        return self.transport.get_json(url=self.next_link, headers=headers)
 
     def __parse_response(self, response: dict) -> list[Entry]:
         if (
@@ -0,0 +1,106 @@
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+from loader.remote.cache import ResponseCache
+from loader.remote.connectors.rate_limiter import RateLimiter
+from loader.remote.parameters import Parameters
+
+
+class Transport:
+    """ HTTP transport shared by the connectors of a provider. Connections are kept open in a pool, requests are rate
+    limited and the ones failing because of the rate or a server error are retried with exponential backoff. JSON
+    responses are read from the response cache, if configured (see loader.remote.cache). It is configured with the parameters of the provider:
+      - rate_limit: maximum requests per second (no limit by default)
+      - burst: requests which can be started at once without waiting for the rate limit (1 by default)
+      - max_retries: retries of a failed request before giving up (5 by default)
+      - backoff: seconds to wait before the first retry, doubled after each one (1 by default)
+      - timeout: seconds to wait for a response (60 by default)
+    """
+
+    __TRANSPORTS = {}
+    __LOCK = threading.Lock()
+    __RETRY_STATUS__ = {429, 500, 502, 503, 504}
+    __MAX_BACKOFF__ = 300
+
+    def __init__(self, name: str, parameters: dict) -> None:
+        self.name = name
+        self.parameters = parameters
+        self.rate_limiter = RateLimiter(parameters.get("rate_limit", None), parameters.get("burst", 1))
+        self.max_retries = parameters.get("max_retries", 5)
+        self.backoff = parameters.get("backoff", 1)
+        self.timeout = parameters.get("timeout", 60)
+
+        # enough connections for the pages requested at the same time
+        adapter = HTTPAdapter(pool_maxsize=max(10, parameters.get("concurrency", 1)))
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @staticmethod
+    def get_transport(name: str) -> "Transport":
+        parameters = Parameters.get_parameters(name)
+        with Transport.__LOCK:
+            transport = Transport.__TRANSPORTS.get(name)
+            # a new transport is created if the parameters were initialized again
+            if transport is None or transport.parameters is not parameters:
+                transport = Transport(name, parameters)
+                Transport.__TRANSPORTS[name] = transport
+
+        return transport
+
+    def get_json(self, url: str, params: dict = None, headers: dict = None) -> dict:
+        cache = ResponseCache.get_cache()
+        if cache is not None:
+            response = cache.get(self.name, url, params)
+            if response is not None:
+                return response
+
+        response = self.get(url, params, headers)
+        response.raise_for_status()
+        response = response.json()
+
+        if cache is not None:
+            cache.put(self.name, url, params, response)
+
+        return response
+
+    def get(self, url: str, params: dict = None, headers: dict = None) -> requests.Response:
+        retry = 0
+        while True:
+            self.rate_limiter.wait()
+            try:
+                response = self.session.get(url=url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if retry >= self.max_retries:
+                    raise
+                delay = self.backoff * 2 ** retry
+            else:
+                if response.status_code not in Transport.__RETRY_STATUS__ or retry >= self.max_retries:
+                    return response
+                delay = Transport.__get_retry_after(response)
+                if delay is None:
+                    delay = self.backoff * 2 ** retry
+
+            time.sleep(min(delay, Transport.__MAX_BACKOFF__))
+            retry += 1
+
+    @staticmethod
+    def __get_retry_after(response: requests.Response) -> float | None:
+        # Retry-After is either a number of seconds or a date
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is None:
+            return None
+
+        try:
+            return max(0, float(retry_after))
+        except ValueError:
+            pass
+
+        try:
+            return max(0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
@@ -1,22 +1,46 @@
+from typing import Iterator, Self
+
+from database.entry import Entry
 from loader.remote.connectors.ieee import IEEEConnector
 from model.resource import ResourceData
 from query.exporter.ieee import IEEEQuery
 from query.exporter.serializer import get_query_string
 from query.model.query import Query
+from query.planner.planner import QueryPlanner
 
 
 class IEEE:
+    NAME = "ieee"
+
     def __init__(self, query: str) -> None:
         self.connector = IEEEConnector(query)
 
     def __init__(self, query: Query) -> None:
-        self.connector = IEEEConnector(get_query_string(query, IEEEQuery))
+        self.query = get_query_string(query, IEEEQuery)
+        self.connector = IEEEConnector(self.query)
+        self.query_model = query
+
+    def split(self) -> list[Self]:
+        # searches within the limits of the API, whose union is this search
+        planner = QueryPlanner(
+            IEEEQuery,
+            self.connector.max_query_length,
+            self.connector.max_results,
+            lambda query: IEEE(query).request_total(),
+        )
+        return [IEEE(query) for query in planner.plan(self.query_model)]
 
-    def request_all(self) -> list[ResourceData]:
-        return self.connector.request_all()
+    def request_total(self) -> int:
+        return self.connector.request_total()
+
+    def request_pages(self, checkpoint: dict | None = None) -> Iterator[list[Entry]]:
+        return self.connector.request_pages(checkpoint)
 
     def request_first(self) -> list[ResourceData]:
         return self.connector.request_first()
 
     def request_next(self) -> list[ResourceData]:
         return self.connector.request_next()
+
+    def get_checkpoint(self) -> dict:
+        return self.connector.get_checkpoint()
@@ -0,0 +1,199 @@
+""" Normalization of the fields of scientific resources. Exporters write the same values in different ways (LaTeX
+markup in bibtex files, DOIs as URLs, different keyword separators, ...), so every resource is normalized once before
+it is stored, and everything computed from its fields (deduplication keys, screening, search) uses the normalized form
+"""
+
+import re
+import unicodedata
+
+from model.resource import ResourceData
+
+__NORMALIZED__ = "normalized"
+# combining character of each accent command, e.g. \'e or \c{c}
+__LATEX_ACCENTS__ = {
+    "'": "\u0301", "`": "\u0300", "^": "\u0302", '"': "\u0308", "~": "\u0303", "=": "\u0304", ".": "\u0307",
+    "u": "\u0306", "v": "\u030c", "H": "\u030b", "c": "\u0327", "k": "\u0328", "r": "\u030a", "d": "\u0323",
+    "b": "\u0331",
+}
+__LATEX_SYMBOLS__ = {
+    "ss": "\u00df", "ae": "\u00e6", "AE": "\u00c6", "oe": "\u0153", "OE": "\u0152", "o": "\u00f8", "O": "\u00d8",
+    "aa": "\u00e5", "AA": "\u00c5", "l": "\u0142", "L": "\u0141", "i": "\u0131", "j": "\u0237",
+}
+# accents made of a symbol can be followed by the letter, the ones made of a letter need a space or braces
+__LATEX_ACCENT__ = re.compile(
+    r"\\(?:([`'^\"~=.])\s*|([uvHckrdb])(?:\s+|(?=\{)))(?:\{\s*(\\[ij]|[a-zA-Z])\s*\}|(\\[ij](?![a-zA-Z])|[a-zA-Z]))"
+)
+__LATEX_SYMBOL__ = re.compile(
+    r"\\(" + "|".join(sorted(__LATEX_SYMBOLS__, key=len, reverse=True)) + r")(?![a-zA-Z])(?:\{\}|\s*)"
+)
+# formatting commands, whose argument is kept
+__LATEX_FORMAT__ = re.compile(
+    r"\\(?:(?:text(?:it|bf|rm|sf|tt|sc|up|sl|md|normal)?|emph|math(?:rm|it|bf|sf|tt)|mbox)\s*(?=\{)"
+    + r"|(?:it|bf|em|rm|sc|sl|tt|sf|itshape|bfseries|scshape|upshape|normalfont)(?![a-zA-Z])\s*)"
+)
+__LATEX_GROUP__ = re.compile(r"\{([^{}]*)\}")
+__LATEX_ESCAPE__ = re.compile(r"\\([&%$#_])")
+# escaped braces are kept apart while the grouping braces are removed
+__ESCAPED_BRACES__ = (("\\{", "\ue000"), ("\\}", "\ue001"))
+__DOI_PREFIX__ = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+__ISBN_SEPARATOR__ = re.compile(r"[;,|]")
+__ISBN__ = re.compile(r"^(?:\d{9}[\dX]|\d{13})$")
+__KEYWORD_SEPARATOR__ = re.compile(r"[;|]")
+
+
+def decode_latex(text: str) -> str:
+    """ Decode the LaTeX markup of a text: accents and symbols are converted to unicode, and formatting commands,
+    escapes and grouping braces are removed. Only known markup is decoded, anything else (e.g. %, unknown commands or
+    unbalanced braces) is kept as it is, so no text is lost
+
+    Args:
+        text (str): Text, possibly with LaTeX markup
+
+    Returns:
+        str: Text without LaTeX markup
+    """
+    # looking for the characters with "in" is much faster than a regular expression
+    if "\\" not in text and "{" not in text:
+        return text
+
+    for escaped, placeholder in __ESCAPED_BRACES__:
+        text = text.replace(escaped, placeholder)
+
+    text = __LATEX_ACCENT__.sub(__decode_accent, text)
+    text = __LATEX_SYMBOL__.sub(lambda match: __LATEX_SYMBOLS__[match.group(1)], text)
+    text = __LATEX_FORMAT__.sub("", text)
+
+    # innermost groups first, until there are no balanced braces left
+    previous = None
+    while previous != text:
+        previous = text
+        text = __LATEX_GROUP__.sub(r"\1", text)
+
+    text = __LATEX_ESCAPE__.sub(r"\1", text)
+    for escaped, placeholder in __ESCAPED_BRACES__:
+        text = text.replace(placeholder, escaped[1])
+
+    return unicodedata.normalize("NFC", text)
+
+
+def __decode_accent(match: re.Match) -> str:
+    """ Get the accented letter of an accent command
+
+    Args:
+        match (re.Match): Match of the accent command
+
+    Returns:
+        str: Letter with the combining character of the accent
+    """
+    accent = match.group(1) or match.group(2)
+    letter = match.group(3) or match.group(4)
+    # accents on i and j are written on their dotless form
+    if letter.startswith("\\"):
+        letter = letter[1]
+
+    return letter + __LATEX_ACCENTS__[accent]
+
+
+def normalize_text(text: str) -> str:
+    """ Normalize a text: LaTeX markup is decoded, the unicode NFKC form is used (e.g. ligatures are split) and any
+    sequence of white spaces is replaced by a single space
+
+    Args:
+        text (str): Text to normalize
+
+    Returns:
+        str: Normalized text
+    """
+    if text is None:
+        return ""
+
+    return " ".join(unicodedata.normalize("NFKC", decode_latex(text)).split())
+
+
+def canonical_doi(doi: str) -> str:
+    """ Get the canonical form of a DOI. Resolver prefixes (https://doi.org/, doi:) are removed and, as DOIs are case
+    insensitive, it is lowercased
+
+    Args:
+        doi (str): DOI as found in the scientific resource
+
+    Returns:
+        str: Canonical DOI, empty if there is none
+    """
+    if doi is None:
+        return ""
+
+    return __DOI_PREFIX__.sub("", doi.strip()).strip().lower()
+
+
+def canonical_isbn(isbn: str) -> str:
+    """ Get the canonical form of the ISBNs of a resource. Hyphens and spaces are removed from each ISBN
+
+    Args:
+        isbn (str): ISBNs as found in the scientific resource, separated by ';', ',' or '|'
+
+    Returns:
+        str: Canonical ISBNs, separated by ' | '
+    """
+    if isbn is None:
+        return ""
+
+    isbns = []
+    for value in __ISBN_SEPARATOR__.split(isbn):
+        value = value.strip()
+        compact = value.replace("-", "").replace(" ", "").upper()
+        value = compact if __ISBN__.match(compact) else value
+        if value != "" and value not in isbns:
+            isbns.append(value)
+
+    return " | ".join(isbns)
+
+
+def split_keywords(keywords: str) -> list[str]:
+    """ Split the keywords of a resource. Keywords are separated by ';' or '|', or by ',' if none of them is used
+    (e.g. in bibtex files)
+
+    Args:
+        keywords (str): Keywords as found in the scientific resource
+
+    Returns:
+        list[str]: Normalized keywords, without repetitions
+    """
+    if keywords is None:
+        return []
+
+    if __KEYWORD_SEPARATOR__.search(keywords) is not None:
+        keywords = __KEYWORD_SEPARATOR__.split(keywords)
+    else:
+        keywords = keywords.split(",")
+
+    split = []
+    seen = set()
+    for keyword in keywords:
+        keyword = normalize_text(keyword)
+        if keyword != "" and keyword.casefold() not in seen:
+            seen.add(keyword.casefold())
+            split.append(keyword)
+
+    return split
+
+
+def normalize_resource(resource: ResourceData) -> None:
+    """ Normalize the fields of a scientific resource in place. Resources already normalized are not changed
+
+    Args:
+        resource (ResourceData): Scientific resource to normalize
+    """
+    if resource.cache.get(__NORMALIZED__):
+        return
+
+    resource.doi = canonical_doi(resource.doi)
+    resource.isbn = canonical_isbn(resource.isbn)
+    resource.title = normalize_text(resource.title)
+    resource.abstract = normalize_text(resource.abstract)
+    resource.keywords = " | ".join(split_keywords(resource.keywords))
+
+    # anything computed from the fields before normalizing them is not valid anymore
+    resource.cache.clear()
+    resource.cache[__NORMALIZED__] = True
+
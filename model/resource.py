@@ -37,6 +37,8 @@ class ResourceData:
         self.title = title
         self.abstract = abstract
         self.keywords = keywords
+        # values computed from the fields (e.g. normalized keys), so they are computed only once for each resource
+        self.cache = {}
     
     def __str__(self) -> str:
         """ Get the string representaiton of a scientific resource. Useful for debugging purposses
@@ -0,0 +1,289 @@
+""" Impact of each part of a query on its results over the resources of a local database, used to tune a search
+
+The entries matching each term in each field (its posting list) are got once from the full-text index, and the
+result of every part of the query is computed from them with set operations in a single pass over the query tree.
+"""
+
+from typing import Callable
+
+from query.model.query import Field, Operator, Query, SingleQuery
+
+
+class ImpactRow:
+    """ Impact of a part of a query: a sub-query, a single query or a term of a single query
+    """
+
+    def __init__(self, depth: int, label: str, matches: set[int], marginal: set[int], filtered: set[int]) -> None:
+        """ Constructor
+
+        Args:
+            depth (int): Depth of the part in the query tree
+            label (str): Description of the part
+            matches (set[int]): IDs of the entries matching the part
+            marginal (set[int]): IDs of the entries matching the query only because of the part
+            filtered (set[int]): IDs of the entries which would match the query without the part
+        """
+        self.depth = depth
+        self.label = label
+        self.matches = matches
+        self.marginal = marginal
+        self.filtered = filtered
+
+
+class ImpactAnalysis:
+    """ Impact analysis of the parts of a query. For each part, it finds the entries matching it, the ones it alone
+    adds to the results of the query (the marginal hits, lost if the part is removed) and the ones it alone removes
+    from the results (the filtered entries, added if the part is removed). A part is removed by replacing it by
+    nothing in an OR and by everything in an AND. Results are computed as the other evaluators do: the terms of a
+    single query are joined with its operator in each field, and the fields (each negated on its own if the query is
+    negated) are joined with the same operator
+    """
+
+    def __init__(self, get_postings: Callable[[Field, str], set[int]], rejected: dict[int, int]) -> None:
+        """ Constructor
+
+        Args:
+            get_postings (Callable[[Field, str], set[int]]): Function getting the IDs of the entries containing a term
+            in a field
+            rejected (dict[int, int]): Rejected value of each entry ID, all the entries of the database
+        """
+        self.get_postings = get_postings
+        self.rejected = rejected
+        self.universe = set(rejected.keys())
+        self.postings = {}
+        # results of each part of the query tree, and the parent of each part
+        self.results = {}
+        self.parents = {}
+
+    def analyze(self, query: Query) -> tuple[set[int], list[ImpactRow]]:
+        """ Analyze the impact of the parts of a query
+
+        Args:
+            query (Query): Query to analyze
+
+        Returns:
+            tuple[set[int], list[ImpactRow]]: IDs of the entries matching the query, and the impact of each part, in
+            the order of the query tree
+        """
+        self.results = {}
+        self.parents = {}
+        matches = self.__evaluate(query, None)
+
+        rows = []
+        self.__analyze(query, 0, matches, rows)
+        return (matches, rows)
+
+    def get_summary(self, query: Query) -> str:
+        """ Analyze the impact of the parts of a query and get it as a human readable table. For the entries matching
+        each part and its marginal hits, the number of entries of each rejected value is shown in brackets
+
+        Args:
+            query (Query): Query to analyze
+
+        Returns:
+            str: Table of the impact of each part
+        """
+        matches, rows = self.analyze(query)
+
+        table = [["part", "matches", "marginal", "filtered"]]
+        for row in rows:
+            table.append(
+                [
+                    "  " * row.depth + row.label,
+                    self.__get_counts_string(row.matches),
+                    self.__get_counts_string(row.marginal),
+                    str(len(row.filtered)),
+                ]
+            )
+
+        widths = [max(len(line[index]) for line in table) for index in range(len(table[0]))]
+        lines = ["Query matches " + self.__get_counts_string(matches) + " of " + str(len(self.universe)) + " entries"]
+        lines += ["  ".join(value.ljust(width) for value, width in zip(line, widths)).rstrip() for line in table]
+        return "\n".join(lines)
+
+    def get_rejected_counts(self, ids: set[int]) -> dict[int, int]:
+        """ Count entries by their rejected value
+
+        Args:
+            ids (set[int]): IDs of the entries
+
+        Returns:
+            dict[int, int]: Number of entries of each rejected value, sorted by value
+        """
+        counts = {}
+        for id in ids:
+            counts[self.rejected[id]] = counts.get(self.rejected[id], 0) + 1
+
+        return dict(sorted(counts.items(), key=lambda item: (item[0] is None, item[0] or 0)))
+
+    def __get_counts_string(self, ids: set[int]) -> str:
+        """ Get the number of entries and the number of them of each rejected value
+
+        Args:
+            ids (set[int]): IDs of the entries
+
+        Returns:
+            str: Number of entries, followed by the number of each rejected value in brackets
+        """
+        counts = self.get_rejected_counts(ids)
+        if len(counts) == 0:
+            return "0"
+
+        return str(len(ids)) + " [" + " ".join(str(value) + ":" + str(count) for value, count in counts.items()) + "]"
+
+    def __analyze(self, query: Query | SingleQuery, depth: int, matches: set[int], rows: list[ImpactRow]) -> None:
+        """ Add the impact of a part of the query and of all its parts
+
+        Args:
+            query (Query | SingleQuery): Part of the query
+            depth (int): Depth of the part
+            matches (set[int]): IDs of the entries matching the whole query
+            rows (list[ImpactRow]): Rows where to add the impact
+        """
+        without = self.__propagate(query, self.__get_neutral(self.parents[id(query)]))
+        rows.append(
+            ImpactRow(
+                depth, ImpactAnalysis.__get_label(query), self.results[id(query)], matches - without, without - matches
+            )
+        )
+
+        if type(query) == Query:
+            for sub_query in query.queries:
+                self.__analyze(sub_query, depth + 1, matches, rows)
+            return
+
+        for term in query.terms:
+            terms = [other for other in query.terms if other != term]
+            term_matches = set().union(*(self.__get_postings(field, term) for field in query.fields))
+            # without its only term, the single query is removed
+            if len(terms) == 0:
+                without = self.__propagate(query, self.__get_neutral(self.parents[id(query)]))
+            else:
+                without = self.__propagate(query, self.__evaluate_single(query, terms))
+            rows.append(ImpactRow(depth + 1, '"' + term + '"', term_matches, matches - without, without - matches))
+
+    def __evaluate(self, query: Query | SingleQuery, parent: Query | None) -> set[int]:
+        """ Get the entries matching a part of the query, keeping the result of the part and of its parts
+
+        Args:
+            query (Query | SingleQuery): Part of the query
+            parent (Query | None): Query the part belongs to, None for the whole query
+
+        Returns:
+            set[int]: IDs of the matching entries
+        """
+        self.parents[id(query)] = parent
+        if type(query) == Query:
+            result = self.__combine(query.operator, [self.__evaluate(sub_query, query) for sub_query in query.queries])
+        else:
+            result = self.__evaluate_single(query, query.terms)
+
+        self.results[id(query)] = result
+        return result
+
+    def __evaluate_single(self, query: SingleQuery, terms: list[str]) -> set[int]:
+        """ Get the entries matching a single query with some of its terms
+
+        Args:
+            query (SingleQuery): Single query
+            terms (list[str]): Terms of the single query to use
+
+        Returns:
+            set[int]: IDs of the matching entries
+        """
+        fields = []
+        for field in query.fields:
+            result = self.__combine(query.operator, [self.__get_postings(field, term) for term in terms])
+            fields.append(self.universe - result if query.negated else result)
+
+        return self.__combine(query.operator, fields)
+
+    def __propagate(self, query: Query | SingleQuery, result: set[int]) -> set[int]:
+        """ Get the entries matching the whole query if a part matched other entries. Only the ancestors of the part
+        are evaluated again, the results of the other parts are reused
+
+        Args:
+            query (Query | SingleQuery): Part of the query
+            result (set[int]): IDs of the entries the part would match
+
+        Returns:
+            set[int]: IDs of the entries the whole query would match
+        """
+        parent = self.parents[id(query)]
+        while parent is not None:
+            result = self.__combine(
+                parent.operator,
+                [result if sub_query is query else self.results[id(sub_query)] for sub_query in parent.queries],
+            )
+            query = parent
+            parent = self.parents[id(query)]
+
+        return result
+
+    def __combine(self, operator: Operator, results: list[set[int]]) -> set[int]:
+        """ Join results with an operator. Joining nothing gives the neutral element of the operator
+
+        Args:
+            operator (Operator): Operator
+            results (list[set[int]]): Results to join
+
+        Returns:
+            set[int]: Joined results
+        """
+        if len(results) == 0:
+            return set(self.universe) if operator == Operator.AND else set()
+
+        if operator == Operator.AND:
+            return set.intersection(*results)
+
+        return set.union(*results)
+
+    def __get_neutral(self, parent: Query | None) -> set[int]:
+        """ Get the result of a removed part: everything in an AND and nothing in an OR. Removing the whole query
+        leaves nothing
+
+        Args:
+            parent (Query | None): Query the part belongs to
+
+        Returns:
+            set[int]: IDs of the entries the removed part matches
+        """
+        if parent is not None and parent.operator == Operator.AND:
+            return self.universe
+
+        return set()
+
+    def __get_postings(self, field: Field, term: str) -> set[int]:
+        """ Get the entries containing a term in a field, getting them only once for each field and term
+
+        Args:
+            field (Field): Field
+            term (str): Term
+
+        Returns:
+            set[int]: IDs of the entries
+        """
+        key = (field, term.casefold())
+        if key not in self.postings:
+            self.postings[key] = self.get_postings(field, term)
+
+        return self.postings[key]
+
+    def __get_label(query: Query | SingleQuery) -> str:
+        """ Get the description of a part of the query
+
+        Args:
+            query (Query | SingleQuery): Part of the query
+
+        Returns:
+            str: Description of the part
+        """
+        if type(query) == Query:
+            return query.operator.name
+
+        return (
+            ("NOT " if query.negated else "")
+            + query.operator.name
+            + " in "
+            + ", ".join(field.name.lower() for field in query.fields)
+        )
@@ -0,0 +1,243 @@
+""" In-memory evaluation of queries over scientific resources, used to screen resources before they are stored
+"""
+
+from typing import Callable, Iterable, Iterator
+
+from database import dedup
+from database.entry import Entry
+from model.resource import ResourceData, ResourceFields
+from query.model.query import Field, Operator, Query, SingleQuery
+
+__SEARCHED_FIELDS__ = {
+    Field.TITLE: ResourceFields.TITLE,
+    Field.ABSTRACT: ResourceFields.ABSTRACT,
+    Field.KEYWORDS: ResourceFields.KEYWORDS,
+}
+
+
+def normalize(text: str) -> str:
+    """ Normalize a text to look for terms in it. Case is ignored and any character which is not a letter or a digit
+    is considered a word separator, as the full-text index of the database does. The text is surrounded by spaces, so
+    a word-bounded term can be found as a substring
+
+    Args:
+        text (str): Text to normalize
+
+    Returns:
+        str: Normalized text
+    """
+    key = dedup.text_key(text)
+    return " " + key + " " if key is not None else " "
+
+
+def normalized_field(resource: ResourceData, field: Field) -> str:
+    """ Get the normalized text of a field of a scientific resource, as normalize does. The normalized fields are the
+    ones used for deduplication, cached in the resource (see database.dedup.get_text_key). The ALL field includes the
+    title, abstract and keywords
+
+    Args:
+        resource (ResourceData): Scientific resource
+        field (Field): Field to get
+
+    Returns:
+        str: Normalized text of the field
+    """
+    if field == Field.ALL:
+        keys = [dedup.get_text_key(resource, __SEARCHED_FIELDS__[searched]) for searched in __SEARCHED_FIELDS__]
+    else:
+        keys = [dedup.get_text_key(resource, __SEARCHED_FIELDS__[field])]
+
+    return " " + " ".join(key for key in keys if key is not None) + " "
+
+
+class TermMatcher:
+    """ Matcher of all the terms of a field at once. The normalized terms are indexed by their first word, so a text
+    is split into words once and only the terms starting with one of its words are checked, instead of scanning the
+    text once per term. Terms which overlap or contain each other are all found. With a few first words, looking for
+    each of them in the text is faster than splitting it, so that is done instead.
+    """
+
+    # maximum number of first words looked for in the text instead of splitting it
+    __SCAN_LIMIT = 8
+
+    def __init__(self) -> None:
+        """ Constructor. The matcher has no terms
+        """
+        # bits of the one word terms and longer terms with their bits by first word, and first words as found in texts
+        self.words = {}
+        self.padded_words = {}
+        # bits of the terms without words, found in any text
+        self.empty = 0
+
+    def add(self, term: str, bit: int) -> None:
+        """ Add a term to the matcher
+
+        Args:
+            term (str): Normalized term (see normalize)
+            bit (int): Bit set when the term is found
+        """
+        words = term.split()
+        if len(words) == 0:
+            self.empty |= bit
+            return
+
+        entry = self.words.setdefault(words[0], [0, []])
+        self.padded_words[words[0]] = " " + words[0] + " "
+        if len(words) == 1:
+            entry[0] |= bit
+        else:
+            entry[1].append((term, bit))
+
+    def match(self, text: str) -> int:
+        """ Get the bitset of the terms found in a text
+
+        Args:
+            text (str): Normalized text (see normalize)
+
+        Returns:
+            int: Bitset with the bit of each term found set
+        """
+        if len(self.words) <= TermMatcher.__SCAN_LIMIT:
+            found = [word for word, padded in self.padded_words.items() if padded in text]
+        else:
+            found = self.words.keys() & set(text.split())
+
+        hits = self.empty
+        for word in found:
+            bits, phrases = self.words[word]
+            hits |= bits
+            for phrase, bit in phrases:
+                if phrase in text:
+                    hits |= bit
+
+        return hits
+
+
+class ScreeningEngine:
+    """ Compiled evaluator of a query. All the terms of the query are gathered per field and each term is assigned a
+    bit, so a document is matched once per field (see TermMatcher) to get a bitset of the terms found, no matter how
+    many terms the query has or how many times a term appears in it. The query tree is compiled into a function which
+    evaluates over that bitset.
+    """
+
+    def __init__(self, query: Query) -> None:
+        """ Constructor. Compiles the query
+
+        Args:
+            query (Query): Query to evaluate
+        """
+        # bit of each normalized term and matcher of each field, and original field and term of each bit
+        self.terms = {}
+        self.matchers = {}
+        self.bits = []
+        self.evaluate = self.__compile(query)
+
+    def screen(self, resource: ResourceData) -> tuple[bool, list[tuple[Field, str]]]:
+        """ Evaluate the query over a scientific resource
+
+        Args:
+            resource (ResourceData): Scientific resource to evaluate
+
+        Returns:
+            tuple[bool, list[tuple[Field, str]]]: If the resource matches the query and the field and term of each term found
+        """
+        hits = self.get_hits(resource)
+        return (self.evaluate(hits), self.get_terms(hits))
+
+    def screen_entries(
+        self, entries: Iterable[Entry]
+    ) -> Iterator[tuple[Entry, bool, list[tuple[Field, str]]]]:
+        """ Evaluate the query over entries
+
+        Args:
+            entries (Iterable[Entry]): Entries to evaluate
+
+        Yields:
+            Iterator[tuple[Entry, bool, list[tuple[Field, str]]]]: Entry, if it matches the query and the terms found in it
+        """
+        for entry in entries:
+            matched, terms = self.screen(entry.resource)
+            yield (entry, matched, terms)
+
+    def get_hits(self, resource: ResourceData) -> int:
+        """ Get the bitset of the terms found in a scientific resource
+
+        Args:
+            resource (ResourceData): Scientific resource
+
+        Returns:
+            int: Bitset with the bit of each term found set
+        """
+        hits = 0
+        for field, matcher in self.matchers.items():
+            hits |= matcher.match(normalized_field(resource, field))
+
+        return hits
+
+    def get_terms(self, hits: int) -> list[tuple[Field, str]]:
+        """ Get the terms of a bitset
+
+        Args:
+            hits (int): Bitset of terms
+
+        Returns:
+            list[tuple[Field, str]]: Field and term of each bit set
+        """
+        terms = []
+        while hits != 0:
+            bit = hits & -hits
+            terms.append(self.bits[bit.bit_length() - 1])
+            hits ^= bit
+
+        return terms
+
+    def __get_bit(self, field: Field, term: str) -> int:
+        """ Get the bit assigned to a term in a field, assigning a new one if the term was not found before
+
+        Args:
+            field (Field): Field of the term
+            term (str): Term as written in the query
+
+        Returns:
+            int: Bit of the term
+        """
+        normalized = normalize(term)
+        terms = self.terms.setdefault(field, {})
+        if normalized not in terms:
+            terms[normalized] = 1 << len(self.bits)
+            self.matchers.setdefault(field, TermMatcher()).add(normalized, terms[normalized])
+            self.bits.append((field, term))
+
+        return terms[normalized]
+
+    def __compile(self, query: Query | SingleQuery) -> Callable[[int], bool]:
+        """ Compile a query into a function over the bitset of terms found
+
+        Args:
+            query (Query | SingleQuery): Query to compile
+
+        Returns:
+            Callable[[int], bool]: Function telling if a bitset matches the query
+        """
+        if type(query) == Query:
+            sub_queries = [self.__compile(sub_query) for sub_query in query.queries]
+            if query.operator == Operator.AND:
+                return lambda hits: all(sub_query(hits) for sub_query in sub_queries)
+            return lambda hits: any(sub_query(hits) for sub_query in sub_queries)
+
+        masks = []
+        for field in query.fields:
+            mask = 0
+            for term in query.terms:
+                mask |= self.__get_bit(field, term)
+            masks.append(mask)
+
+        # as in the generators, each field is negated on its own and the fields are joined with the operator
+        if query.operator == Operator.AND:
+            if query.negated:
+                return lambda hits: all(hits & mask != mask for mask in masks)
+            return lambda hits: all(hits & mask == mask for mask in masks)
+
+        if query.negated:
+            return lambda hits: any(hits & mask == 0 for mask in masks)
+        return lambda hits: any(hits & mask != 0 for mask in masks)
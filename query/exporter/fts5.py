@@ -0,0 +1,156 @@
+from query.model.query import Field, Operator, Query, SingleQuery
+from query.exporter.serializer import QueyGenerator
+
+
+class FTS5Query(QueyGenerator):
+    """ Specific query generator for the SQLite FTS5 full-text index of the local database. FTS5 only supports NOT as
+    a binary operator (a NOT b), so negated queries are handled by get_match_string, which subtracts them from the
+    rest of the query
+    """
+    __OPERATOR_MAP = {Operator.AND: "AND", Operator.OR: "OR"}
+    __DUAL_OPERATOR_MAP = {Operator.AND: Operator.OR, Operator.OR: Operator.AND}
+    __FIELDS_MAP = {
+        Field.TITLE: "title",
+        Field.ABSTRACT: "abstract",
+        Field.KEYWORDS: "keywords",
+        Field.ALL: None,
+    }
+
+    def get_operator_string(operator: Operator):
+        """ Get the string represenation of an operator for fts5
+
+        Args:
+            operator (Operator): required operator
+
+        Returns:
+            str: String representation of the operator
+        """
+        return FTS5Query.__OPERATOR_MAP.get(operator)
+
+    def get_single_query_string(query: SingleQuery):
+        """ Get the string representation of a SingleQuery for fts5, without taking into account if it is negated
+
+        Args:
+            query (SingleQuery): single query to get the representation from
+
+        Returns:
+            str: string representation of the single query
+        """
+        return FTS5Query.get_fields_string(query, query.operator)
+
+    def get_fields_string(query: SingleQuery, fields_operator: Operator) -> str:
+        """ Get the string representation of the terms of a SingleQuery in each of its fields
+
+        Args:
+            query (SingleQuery): single query to get the representation from
+            fields_operator (Operator): operator used to join the fields
+
+        Returns:
+            str: string representation of the fields
+        """
+        terms = (" " + FTS5Query.get_operator_string(query.operator) + " ").join(
+            '"' + term.replace('"', '""') + '"' for term in query.terms
+        )
+
+        fields = []
+        for field in query.fields:
+            column = FTS5Query.__FIELDS_MAP[field]
+            if column is None:
+                fields.append("(" + terms + ")")
+            else:
+                fields.append(column + " : (" + terms + ")")
+
+        return "(" + (" " + FTS5Query.get_operator_string(fields_operator) + " ").join(fields) + ")"
+
+    def get_negated_string(query: SingleQuery) -> str:
+        """ Get the string representation of what a negated SingleQuery excludes. As in the other generators, a
+        negated query negates each field and joins them with the operator, so by De Morgan's laws it excludes
+        the fields joined with the opposite operator
+
+        Args:
+            query (SingleQuery): negated single query to get the representation from
+
+        Returns:
+            str: string representation of the excluded part of the single query
+        """
+        return FTS5Query.get_fields_string(query, FTS5Query.__DUAL_OPERATOR_MAP[query.operator])
+
+
+def get_match_string(query: Query) -> str:
+    """ Gets the FTS5 MATCH expression of a query
+
+    Args:
+        query (Query): Query representation to be transformed into a MATCH expression
+
+    Raises:
+        Exception: If the query has a negated part which can not be expressed in FTS5, i.e. a negated query inside an
+        OR or a query with only negated parts
+
+    Returns:
+        str: MATCH expression of the query
+    """
+    positive, negatives = __get_match_parts(query)
+    return __subtract(positive, negatives, query)
+
+
+def __subtract(positive: str | None, negatives: list[str], query: Query | SingleQuery) -> str:
+    """ Get the expression matching the positive part but none of the negative ones
+
+    Args:
+        positive (str | None): Positive part of the expression
+        negatives (list[str]): Negative parts of the expression
+        query (Query | SingleQuery): Query the parts come from, used for error reporting
+
+    Raises:
+        Exception: If there is no positive part
+
+    Returns:
+        str: expression of the query
+    """
+    if positive is None:
+        raise Exception(
+            "FTS5 can not match a query with only negated parts. Combine it with AND and a not negated part"
+            + "\nquery = "
+            + str(vars(query))
+        )
+
+    if len(negatives) == 0:
+        return positive
+
+    return "(" + positive + " NOT (" + " OR ".join(negatives) + "))"
+
+
+def __get_match_parts(query: Query | SingleQuery) -> tuple[str | None, list[str]]:
+    """ Get the positive and negative parts of the MATCH expression of a query. The query matches the positive part
+    and none of the negative parts
+
+    Args:
+        query (Query | SingleQuery): Query to get the parts from
+
+    Returns:
+        tuple[str | None, list[str]]: Positive part, None if there is none, and negative parts
+    """
+    if type(query) != Query:
+        if query.negated:
+            return (None, [FTS5Query.get_negated_string(query)])
+        return (FTS5Query.get_single_query_string(query), [])
+
+    parts = [__get_match_parts(sub_query) for sub_query in query.queries]
+
+    if query.operator == Operator.AND:
+        # (a NOT x) AND (b NOT y) is equivalent to (a AND b) NOT (x OR y)
+        positives = [positive for positive, _ in parts if positive is not None]
+        negatives = [negative for _, sub_negatives in parts for negative in sub_negatives]
+        if len(positives) == 0:
+            return (None, negatives)
+        return ("(" + " AND ".join(positives) + ")", negatives)
+
+    return (
+        "("
+        + " OR ".join(
+            __subtract(positive, negatives, sub_query)
+            for (positive, negatives), sub_query in zip(parts, query.queries)
+        )
+        + ")",
+        [],
+    )
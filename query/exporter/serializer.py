@@ -37,20 +37,11 @@ def get_query_string(query: Query, generator: QueyGenerator) -> str:
     Returns:
         str: String representation of the query based on the generator
     """
-    to_return = ""
-    only_one = len(query.queries) == 1
-
-    for index, sub_query in enumerate(query.queries):
-        if index != 0:
-            to_return += " "
+    parts = []
+    for sub_query in query.queries:
         if type(sub_query) == Query:
-            to_return += "("
-            to_return += get_query_string(sub_query, generator)
-            to_return += ")"
+            parts.append("(" + get_query_string(sub_query, generator) + ")")
         else:
-            to_return += generator.get_single_query_string(sub_query)
-
-        if not only_one and index != len(query.queries) - 1:
-            to_return += " " + generator.get_operator_string(query.operator)
+            parts.append(generator.get_single_query_string(sub_query))
 
-    return to_return
+    return (" " + generator.get_operator_string(query.operator) + " ").join(parts)
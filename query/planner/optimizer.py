@@ -0,0 +1,194 @@
+""" Optimization of queries before they are serialized. The query tree is rewritten into an equivalent and smaller
+one, and a canonical form of the query gives a stable key for it, no matter how it was written
+"""
+
+import hashlib
+from typing import Callable
+
+from query.model.query import Operator, Query, SingleQuery
+
+
+def optimize(query: Query) -> Query:
+    """ Rewrite a query into an equivalent and smaller one:
+      - nested queries with the same operator are flattened, e.g. A AND (B AND C) is A AND B AND C
+      - queries with a single sub-query are replaced by it
+      - repeated terms, fields and sub-queries are removed
+      - sibling single queries with the same fields and operator are merged, e.g. title:(A OR B) OR title:(C) is
+        title:(A OR B OR C)
+    Negations are only found in single queries, which are the leaves of the tree, so they are already as deep as
+    they can be. The query given is not changed
+
+    Args:
+        query (Query): Query to optimize
+
+    Returns:
+        Query: Optimized query
+    """
+    optimized = __optimize(query)
+    if type(optimized) == SingleQuery:
+        return Query(query.operator, [optimized])
+
+    return optimized
+
+
+def get_canonical_string(query: Query | SingleQuery) -> str:
+    """ Get the canonical form of a query. The operators are commutative, so sub-queries, fields and terms are sorted,
+    and terms are compared ignoring case and white space. Queries are only equal if they are written in the same
+    way, so the query should be optimized first (see get_hash)
+
+    Args:
+        query (Query | SingleQuery): Query
+
+    Returns:
+        str: Canonical form of the query
+    """
+    if type(query) == SingleQuery:
+        return (
+            ("NOT " if query.negated else "")
+            + __get_operator_name(query)
+            + "["
+            + ",".join(sorted(field.name for field in query.fields))
+            + "]("
+            + ",".join('"' + term + '"' for term in sorted(set(__term_key(term) for term in query.terms)))
+            + ")"
+        )
+
+    return query.operator.name + "(" + ",".join(sorted(get_canonical_string(sub) for sub in query.queries)) + ")"
+
+
+def get_hash(query: Query) -> str:
+    """ Get a hash of a query, the same for any query written in an equivalent way, e.g. to use as a key for the
+    results of the query
+
+    Args:
+        query (Query): Query
+
+    Returns:
+        str: Hexadecimal hash of the canonical form of the optimized query
+    """
+    return hashlib.sha256(get_canonical_string(optimize(query)).encode("utf-8")).hexdigest()
+
+
+def __optimize(query: Query | SingleQuery) -> Query | SingleQuery:
+    """ Optimize a query (see optimize). A query with a single sub-query is returned as its sub-query
+
+    Args:
+        query (Query | SingleQuery): Query to optimize
+
+    Returns:
+        Query | SingleQuery: Optimized query
+    """
+    if type(query) == SingleQuery:
+        return SingleQuery(
+            query.operator,
+            query.negated,
+            __unique(query.fields, lambda field: field),
+            __unique(query.terms, __term_key),
+        )
+
+    sub_queries = []
+    for sub_query in (__optimize(sub_query) for sub_query in query.queries):
+        if type(sub_query) == Query and sub_query.operator == query.operator:
+            sub_queries.extend(sub_query.queries)
+        else:
+            sub_queries.append(sub_query)
+
+    merged = []
+    for sub_query in sub_queries:
+        for index, previous in enumerate(merged):
+            if __can_merge(previous, sub_query, query.operator):
+                merged[index] = SingleQuery(
+                    query.operator, False, previous.fields, __merge_terms(previous.terms, sub_query.terms)
+                )
+                break
+        else:
+            merged.append(sub_query)
+
+    unique = __unique(merged, get_canonical_string)
+
+    if len(unique) == 1:
+        return unique[0]
+
+    return Query(query.operator, unique)
+
+
+def __can_merge(first: Query | SingleQuery, second: Query | SingleQuery, operator: Operator) -> bool:
+    """ Check if two sibling queries can be merged into a single query
+
+    Args:
+        first (Query | SingleQuery): First query
+        second (Query | SingleQuery): Second query
+        operator (Operator): Operator joining the queries
+
+    Returns:
+        bool: True if both are single queries, not negated, with the same fields, and their operator is the one
+        joining them
+    """
+    return (
+        type(first) == SingleQuery
+        and type(second) == SingleQuery
+        and not first.negated
+        and not second.negated
+        and set(first.fields) == set(second.fields)
+        and __get_operator_name(first) in (operator.name, "ANY")
+        and __get_operator_name(second) in (operator.name, "ANY")
+    )
+
+
+def __merge_terms(first: list[str], second: list[str]) -> list[str]:
+    """ Merge the terms of two queries, without repetitions
+
+    Args:
+        first (list[str]): Terms of the first query
+        second (list[str]): Terms of the second query
+
+    Returns:
+        list[str]: Terms of both queries, in order
+    """
+    keys = set(__term_key(term) for term in first)
+    return first + [term for term in second if __term_key(term) not in keys]
+
+
+def __get_operator_name(query: SingleQuery) -> str:
+    """ Get the name of the operator of a single query, ANY if the operator does not matter as it has only a field
+    and a term
+
+    Args:
+        query (SingleQuery): Single query
+
+    Returns:
+        str: Name of the operator
+    """
+    if len(query.fields) <= 1 and len(query.terms) <= 1:
+        return "ANY"
+
+    return query.operator.name
+
+
+def __unique(items: list, key: Callable[[any], any]) -> list:
+    """ Remove the repeated items of a list, keeping the first one
+
+    Args:
+        items (list): Items
+        key (Callable[[any], any]): Function getting the key to compare the items
+
+    Returns:
+        list: Items without repetitions, in order
+    """
+    unique = {}
+    for item in items:
+        unique.setdefault(key(item), item)
+
+    return list(unique.values())
+
+
+def __term_key(term: str) -> str:
+    """ Get the key to compare terms. Search engines ignore case and repeated white spaces
+
+    Args:
+        term (str): Term
+
+    Returns:
+        str: Key of the term
+    """
+    return " ".join(term.split()).casefold()
@@ -0,0 +1,150 @@
+""" Planning of the searches of a query in remote sources, which limit the length of the query and the number of
+results that can be retrieved from a search
+"""
+
+from typing import Callable
+
+from query.exporter.serializer import QueyGenerator, get_query_string
+from query.model.query import Operator, Query, SingleQuery
+
+
+def split(query: Query | SingleQuery) -> list[Query | SingleQuery] | None:
+    """ Split a query in two queries whose union has the same results. An OR is split into two halves of its
+    sub-queries, terms or fields, and an AND is split by its longest splittable sub-query (A AND (B OR C) is
+    (A AND B) OR (A AND C)). Negated queries are never split
+
+    Args:
+        query (Query | SingleQuery): Query to split
+
+    Returns:
+        list[Query | SingleQuery] | None: The two queries, None if the query cannot be split
+    """
+    if type(query) == SingleQuery:
+        if query.operator != Operator.OR or query.negated:
+            return None
+
+        if len(query.terms) > 1:
+            half = len(query.terms) // 2
+            return [
+                SingleQuery(query.operator, query.negated, query.fields, query.terms[:half]),
+                SingleQuery(query.operator, query.negated, query.fields, query.terms[half:]),
+            ]
+
+        if len(query.fields) > 1:
+            half = len(query.fields) // 2
+            return [
+                SingleQuery(query.operator, query.negated, query.fields[:half], query.terms),
+                SingleQuery(query.operator, query.negated, query.fields[half:], query.terms),
+            ]
+
+        return None
+
+    if query.operator == Operator.OR and len(query.queries) > 1:
+        half = len(query.queries) // 2
+        return [Query(Operator.OR, query.queries[:half]), Query(Operator.OR, query.queries[half:])]
+
+    if len(query.queries) == 1:
+        parts = split(query.queries[0])
+        return [Query(query.operator, [part]) for part in parts] if parts is not None else None
+
+    # the AND is split by the sub-query which shortens the query the most
+    for index in sorted(
+        range(len(query.queries)), key=lambda index: -__get_length(query.queries[index])
+    ):
+        parts = split(query.queries[index])
+        if parts is not None:
+            return [
+                Query(query.operator, query.queries[:index] + [part] + query.queries[index + 1:]) for part in parts
+            ]
+
+    return None
+
+
+def __get_length(query: Query | SingleQuery) -> int:
+    """ Get the number of terms of a query, as an estimate of its length in any generator
+
+    Args:
+        query (Query | SingleQuery): Query
+
+    Returns:
+        int: Number of terms, repeated for each field
+    """
+    if type(query) == SingleQuery:
+        return len(query.terms) * len(query.fields)
+
+    return sum(__get_length(sub_query) for sub_query in query.queries)
+
+
+class QueryPlanner:
+    """ Splits a query into queries within the limits of a remote source: the length of the query string and the
+    number of results of a search. The union of the results of the queries is the result of the query, so each
+    query can be searched on its own and the results inserted into the database, where the resources found by more
+    than one query are deduplicated
+    """
+
+    def __init__(
+        self,
+        generator: QueyGenerator,
+        max_length: int | None = None,
+        max_results: int | None = None,
+        count: Callable[[Query], int] | None = None,
+    ) -> None:
+        """ Constructor
+
+        Args:
+            generator (QueyGenerator): Generator of the query strings of the remote source
+            max_length (int | None, optional): Maximum length of a query string. Defaults to None, no limit.
+            max_results (int | None, optional): Maximum results of a search. Defaults to None, no limit.
+            count (Callable[[Query], int] | None, optional): Function getting the number of results of a query, needed
+            to limit the results. Defaults to None.
+        """
+        self.generator = generator
+        self.max_length = max_length
+        self.max_results = max_results
+        self.count = count
+
+    def plan(self, query: Query) -> list[Query]:
+        """ Split a query until each query is within the limits. A query which cannot be split any more is kept as
+        it is, with a warning
+
+        Args:
+            query (Query): Query to plan
+
+        Returns:
+            list[Query]: Queries to search, in order
+        """
+        planned = []
+        pending = [query]
+        while len(pending) != 0:
+            current = pending.pop(0)
+            if self.__fits(current):
+                planned.append(current)
+                continue
+
+            parts = split(current)
+            if parts is None:
+                print("Warning: the query exceeds the limits of the source and cannot be split: "
+                      + get_query_string(current, self.generator))
+                planned.append(current)
+            else:
+                # the parts go first, so the queries keep the order of the terms
+                pending[0:0] = parts
+
+        return planned
+
+    def __fits(self, query: Query) -> bool:
+        """ Check if a query is within the limits. The number of results is only requested if the length is fine
+
+        Args:
+            query (Query): Query to check
+
+        Returns:
+            bool: True if the query is within the limits
+        """
+        if self.max_length is not None and len(get_query_string(query, self.generator)) > self.max_length:
+            return False
+
+        if self.max_results is not None and self.count is not None and self.count(query) > self.max_results:
+            return False
+
+        return True